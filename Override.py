@@ -1,48 +1,29 @@
 import streamlit as st
-import pandas as pd
-from snowflake.snowpark import Session
 from datetime import datetime
- 
-# Page configuration
-st.set_page_config(
-    page_title="Editable Data Override App",
-    page_icon="📊",
-    layout="centered"
-)
- 
-# Title with custom styling
-st.markdown("<h1 style='text-align: center; color: #1E88E5;'>Override Dashboard</h1>", unsafe_allow_html=True)
- 
-# Retrieve Snowflake credentials from Streamlit secrets
-
-# Connect to Snowflake
-def connect_to_snowflake():
-    try:
-        connection_parameters = {
-            "account": st.secrets["SNOWFLAKE_ACCOUNT"],
-            "user": st.secrets["SNOWFLAKE_USER"],
-            "password": st.secrets["SNOWFLAKE_PASSWORD"],
-            "warehouse": st.secrets["SNOWFLAKE_WAREHOUSE"],
-            "database": st.secrets["SNOWFLAKE_DATABASE"],
-            "schema": st.secrets["SNOWFLAKE_SCHEMA"],
-        }
-        session = Session.builder.configs(connection_parameters).create()
-        st.success("✅ Successfully connected to Snowflake!")
-        return session
-    except Exception as e:
-        st.error(f"❌ Connection failed: {e}")
-        st.stop()
 
-session = connect_to_snowflake()
+from app_core import (
+    page_header,
+    get_session,
+    guarded_fetch,
+    fetch_override_ref_data,
+    render_summary,
+    render_as_of,
+    render_revert,
+)
+from change_feed import publish_changes, publish_reload
+from override_engine import (
+    override_config_from_ref,
+    fetch_table_metadata,
+    read_override_file,
+    detect_changes,
+    validate_changes,
+    stage_changes,
+    preview_staged_changes,
+    apply_staged_changes,
+)
 
-# Retrieve Configuration Data from Override_Ref
-def fetch_override_ref_data(module_number):
-    try:
-        df = session.sql(f"SELECT * FROM override_ref WHERE module = {module_number}").to_pandas()
-        return df
-    except Exception as e:
-        st.error(f"Error fetching Override_Ref data: {e}")
-        return pd.DataFrame()
+# Page configuration and title
+page_header()
 
 # Example - Assuming module number is passed via query parameters
 query_params = st.query_params
@@ -55,31 +36,121 @@ if override_ref_df.empty:
 else:
     st.write("Configuration Retrieved:", override_ref_df)
 
-# Function to fetch data from a given table
-def fetch_data(table_name):
-    try:
-        query = f"SELECT * FROM {table_name}"
-        df = session.sql(query).to_pandas()
-        # Convert column names to uppercase for consistency
-        df.columns = [col.strip().upper() for col in df.columns]
-        return df
-    except Exception as e:
-        st.error(f"Error fetching data from {table_name}: {e}")
-        return pd.DataFrame()
+# Connect to Snowflake
+session = get_session()
+
+# Pick the source table when the module lists more than one
+selected_table = None
+if override_ref_df['SOURCE_TABLE'].nunique() > 1:
+    selected_table = st.selectbox("Select Table", override_ref_df['SOURCE_TABLE'].unique())
 
 # Extract source and target table names, editable column, and join keys
-source_table = override_ref_df['SOURCE_TABLE'].iloc[0]
-target_table = override_ref_df['TARGET_TABLE'].iloc[0]
-editable_column = override_ref_df['EDITABLE_COLUMN'].iloc[0].strip().upper()
-join_keys = override_ref_df['JOINING_KEYS'].iloc[0].strip().upper().split(',')
+override_config = override_config_from_ref(override_ref_df, selected_table)
+source_table = override_config['source_table']
+target_table = override_config['target_table']
+editable_column = override_config['editable_column']
+join_keys = override_config['join_keys']
+stage_table = f"{source_table}_OVERRIDE_STAGE".upper()
 
 #st.write(f"📊 **Source Table:** {source_table}")
 #st.write(f"📥 **Target Table:** {target_table}")
 #st.write(f"🖋️ **Editable Column:** {editable_column}")
 #st.write(f"🔑 **Joining Keys:** {join_keys}")
 
-# Fetch and display source data
-source_df = fetch_data(source_table)
+# Function to validate and stage a change set, showing every problem at once; returns the staged rows or None
+def validate_and_stage(changes_df, label, location="line"):
+    try:
+        source_metadata = fetch_table_metadata(session, source_table)
+        validation_errors, changes_df = validate_changes(changes_df, source_metadata, editable_column, join_keys,
+                                                         override_config['rules'], location)
+    except Exception as e:
+        st.error(f"❌ Error validating {label}: {e}")
+        return None
+
+    if validation_errors:
+        for error in validation_errors:
+            st.error(f"❌ {error}")
+        return None
+
+    try:
+        stage_changes(session, changes_df, stage_table)
+    except Exception as e:
+        st.error(f"❌ Error staging {label}: {e}")
+        return None
+    return changes_df
+
+# Function to let other sessions patch their cached copies with the rows a committed submit changed
+def broadcast_changes(changed_df):
+    publish_changes(source_table, join_keys, editable_column, changed_df)
+    publish_reload(target_table)
+
+# Choose between editing rows in the table, uploading a bulk override file, and the summary, as-of and revert views
+override_mode = st.radio("Override Mode", ["Edit in Table", "Upload File", "Summary", "As Of", "Revert"], horizontal=True)
+
+if override_mode == "Summary":
+    render_summary(source_table, target_table, editable_column, join_keys)
+    st.stop()
+
+if override_mode == "As Of":
+    render_as_of(source_table, target_table, editable_column, join_keys)
+    st.stop()
+
+if override_mode == "Revert":
+    render_revert(source_table, target_table, editable_column, join_keys)
+    st.stop()
+
+if override_mode == "Upload File":
+    st.write("📤 **Bulk Override Upload**")
+    st.caption(f"Upload a CSV, Excel or Parquet file with columns: {', '.join(join_keys + [editable_column])}")
+
+    uploaded_file = st.file_uploader("Override File", type=["csv", "xlsx", "xls", "parquet"])
+    if uploaded_file is None:
+        st.stop()
+
+    try:
+        upload_df = read_override_file(uploaded_file)
+    except Exception as e:
+        st.error(f"❌ Error reading {uploaded_file.name}: {e}")
+        st.stop()
+
+    staged_df = validate_and_stage(upload_df, uploaded_file.name)
+    if staged_df is None:
+        st.stop()
+
+    try:
+        counts, preview_df = preview_staged_changes(session, override_config, stage_table)
+    except Exception as e:
+        st.error(f"❌ Error previewing {uploaded_file.name}: {e}")
+        st.stop()
+
+    col1, col2, col3 = st.columns(3)
+    col1.metric("File Rows", counts['FILE_ROWS'])
+    col2.metric("Changed Rows", counts['CHANGED_ROWS'])
+    col3.metric("Unmatched Keys", counts['UNMATCHED_ROWS'])
+
+    st.write("🟢 Change Preview (largest changes first for numeric columns):")
+    st.dataframe(preview_df, use_container_width=True)
+
+    if counts['CHANGED_ROWS'] == 0:
+        st.info("No changes detected. No records to insert.")
+        st.stop()
+
+    if st.button("Apply File Overrides"):
+        try:
+            inserted, changed_df = apply_staged_changes(session, override_config, stage_table)
+            broadcast_changes(changed_df)
+            st.session_state.last_update_time = datetime.now().strftime('%B %d, %Y %H:%M:%S')
+            st.success(f"✅ {inserted} overrides applied from {uploaded_file.name}!")
+        except Exception as e:
+            st.error(f"❌ Error applying overrides: {e}")
+    st.stop()
+
+# Fetch and display source data ('A' records only, checked against the memory budgets first)
+source_df = guarded_fetch(source_table, "RECORD_FLAG = 'A'", join_keys)
+
+if source_df is None:
+    st.info("Use 'Upload File' mode to override this table.")
+    st.stop()
 
 if source_df.empty:
     st.warning("No data found in the source table.")
@@ -108,131 +179,23 @@ edited_data = st.data_editor(
 
 st.write("✅ Review your changes and click 'Submit' when ready.")
 
-# Function to identify changes and insert into target table dynamically
-def insert_into_target_table(session, source_df, edited_data, target_table, editable_column, join_keys):
-    try:
-        # Identify rows where the editable column has changed
-        changes_df = edited_data[edited_data[editable_column] != source_df[editable_column]]
-
-        if changes_df.empty:
-            st.info("No changes detected. No records to insert.")
-            return
+if st.button("Submit Changes"):
+    # Step 1: Identify rows where the editable column has changed
+    changes_df = detect_changes(source_df, edited_data, editable_column, join_keys)
 
+    if changes_df.empty:
+        st.info("No changes detected. No records to insert.")
+    else:
         st.write("🟢 Detected Changes:")
         st.dataframe(changes_df)
 
-        # Fetch the target table columns dynamically
-        target_columns_query = f"SELECT COLUMN_NAME FROM INFORMATION_SCHEMA.COLUMNS WHERE TABLE_NAME = '{target_table.upper()}'"
-        target_columns = [row['COLUMN_NAME'].upper() for row in session.sql(target_columns_query).to_pandas().to_dict('records')]
-
-        # Identify common columns (excluding SRC_INS_TS, editable_column_old, editable_column_new, record_flag, and as_at_date)
-        common_columns = [col for col in source_df.columns if col in target_columns and col not in [editable_column, 'AS_AT_DATE', 'RECORD_FLAG','AS_OF_DATE']]
-
-        for _, row in changes_df.iterrows():
-            old_value = source_df.loc[source_df.index == row.name, editable_column].values[0]
-            new_value = row[editable_column]
-            as_at_date = row['AS_AT_DATE']
-            as_of_date = row['AS_OF_DATE']
-
-            # Forming the dynamic insert query
-            columns_to_insert = ', '.join(common_columns + ['AS_OF_DATE','SRC_INS_TS', f'{editable_column}_OLD', f'{editable_column}_NEW', 'RECORD_FLAG', 'AS_AT_DATE'])
-            values_to_insert = ', '.join([f"'{row[col]}'" if isinstance(row[col], str) else str(row[col]) for col in common_columns])
-            
-            insert_sql = f"""
-                INSERT INTO {target_table} ({columns_to_insert})
-                VALUES (
-                    {values_to_insert},'{as_of_date}', '{as_at_date}', {old_value}, {new_value}, 'A', CURRENT_TIMESTAMP()
-                )
-            """
-            session.sql(insert_sql).collect()
-
-        #st.success(f"✅ Changes inserted into {target_table}")
-
-    except Exception as e:
-        st.error(f"❌ Error inserting into {target_table}: {e}")
-
-# Single 'Submit Changes' button
-# if st.button("Submit Changes"):
-#     insert_into_target_table(session, source_df, edited_data, target_table, editable_column, join_keys)
-
-
-# Function to insert updated records into the source table (Step 4)
-def insert_into_source_table(session, target_table, source_table, editable_column, join_keys):
-    try:
-        # Generate common columns excluding record_flag, as_at_date, and editable_column
-        target_columns_query = f"""
-            SELECT COLUMN_NAME
-            FROM INFORMATION_SCHEMA.COLUMNS
-            WHERE UPPER(TABLE_NAME) = '{source_table.upper()}'
-              AND COLUMN_NAME NOT IN ('RECORD_FLAG', 'AS_AT_DATE', '{editable_column.upper()}')
-        """
-        common_columns = [row['COLUMN_NAME'].upper() for row in session.sql(target_columns_query).to_pandas().to_dict('records')]
-
-        if not common_columns:
-            st.error("No matching common columns found between target and source.")
-            return
-
-        # Formulate the insert SQL query
-        columns_to_insert = ', '.join(common_columns + [editable_column, 'RECORD_FLAG', 'AS_AT_DATE'])
-
-        insert_sql = f"""
-            INSERT INTO {source_table} ({columns_to_insert})
-            SELECT
-                {', '.join([f"src.{col}" for col in common_columns])},
-                src.{editable_column}_NEW,
-                'A',
-                CURRENT_TIMESTAMP(0)
-            FROM {target_table} src
-            JOIN {source_table} tgt
-            ON {" AND ".join([f"tgt.{key} = src.{key}" for key in join_keys])}
-            AND tgt.{editable_column} = src.{editable_column}_OLD
-            WHERE tgt.RECORD_FLAG = 'A';
-        """
-        
-        # Execute SQL
-        session.sql(insert_sql).collect()
-        #st.success(f"✅ Data inserted into {source_table} from {target_table}")
-
-    except Exception as e:
-        st.error(f"❌ Error inserting into {source_table}: {e}")
-
-# Button to trigger Step 4
-# if st.button("Insert into Source Table"):
-#     insert_into_source_table(session, target_table, source_table, editable_column, join_keys)
-
-# Function to update the old record in the source table
-def update_old_record(session, target_table, source_table, editable_column, join_keys):
-    try:
-        # Form the dynamic SQL query to update old records
-        join_condition = " AND ".join([f"tgt.{key} = src.{key}" for key in join_keys])
-
-        update_sql = f"""
-            UPDATE {source_table} tgt
-            SET record_flag = 'D'
-            FROM {target_table} src
-            WHERE {join_condition}
-              AND tgt.{editable_column} = src.{editable_column}_OLD
-              AND tgt.record_flag = 'A';
-        """
-
-        session.sql(update_sql).collect()
-        #st.success(f"✅ Old records updated in {source_table} with record_flag = 'D'")
-
-    except Exception as e:
-        st.error(f"❌ Error updating old records in {source_table}: {e}")
-
-# Call the function when needed
-# if st.button("Update Old Records (Step 5)"):
-#     update_old_record(session, target_table, source_table, editable_column, join_keys)
-
-if st.button("Submit Changes"):
-    # Step 1: Insert into target table (fact_portfolio_perf_override)
-    insert_into_target_table(session, source_df, edited_data, target_table, editable_column, join_keys)
-
-    # Step 2: Insert into source table (fact_portfolio_perf)
-    insert_into_source_table(session, target_table, source_table, editable_column, join_keys)
-
-    # Step 3: Update old records in source table (fact_portfolio_perf)
-    update_old_record(session, target_table, source_table, editable_column, join_keys)
-
-    st.success("✅ Data updated successfully!")
+        # Step 2: Validate every edited value and stage the changes, then apply them as one set-based batch
+        staged_df = validate_and_stage(changes_df, "edited rows", location="row")
+        if staged_df is not None:
+            try:
+                _, changed_df = apply_staged_changes(session, override_config, stage_table)
+                broadcast_changes(changed_df)
+                st.session_state.last_update_time = datetime.now().strftime('%B %d, %Y %H:%M:%S')
+                st.success("✅ Data updated successfully!")
+            except Exception as e:
+                st.error(f"❌ Error applying overrides: {e}")
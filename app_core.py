@@ -0,0 +1,600 @@
+import streamlit as st
+from datetime import datetime
+
+# Shared core for the Streamlit entry points (app.py, CalPERS.py, Override.py, employee.py).
+# Only streamlit is imported up front; pandas, Snowpark and the override engine are imported
+# when data is first needed, so a page that stops early (e.g. no module selected) paints fast.
+
+# Page configuration and title shared by the override dashboards
+def page_header():
+    st.set_page_config(
+        page_title="Editable Data Override App",
+        page_icon="📊",
+        layout="centered"
+    )
+
+    # Title with custom styling
+    st.markdown("<h1 style='text-align: center; color: #1E88E5;'>Override Dashboard</h1>", unsafe_allow_html=True)
+
+# Retrieve Snowflake credentials from Streamlit secrets
+def connection_parameters():
+    return {
+        "account": st.secrets["SNOWFLAKE_ACCOUNT"],
+        "user": st.secrets["SNOWFLAKE_USER"],
+        "password": st.secrets["SNOWFLAKE_PASSWORD"],
+        "warehouse": st.secrets["SNOWFLAKE_WAREHOUSE"],
+        "database": st.secrets["SNOWFLAKE_DATABASE"],
+        "schema": st.secrets["SNOWFLAKE_SCHEMA"],
+    }
+
+# Get the Snowpark session for this user, logging in on first use only
+def get_session():
+    if "snowflake_session" not in st.session_state:
+        try:
+            from override_engine import create_session
+
+            # ✅ Create a Snowpark session
+            st.session_state.snowflake_session = create_session(connection_parameters())
+            st.success("✅ Successfully connected to Snowflake!")
+        except Exception as e:
+            st.error(f"❌ Failed to connect to Snowflake: {e}")
+            st.stop()
+    return st.session_state.snowflake_session
+
+# Memory budgets (MB) for loading a table into the app, overridable in Streamlit secrets
+def fetch_budgets():
+    from override_engine import EAGER_BUDGET_BYTES, PAGED_BUDGET_BYTES
+
+    eager_mb = st.secrets.get("FETCH_EAGER_BUDGET_MB", EAGER_BUDGET_BYTES // (1024 * 1024))
+    paged_mb = st.secrets.get("FETCH_PAGED_BUDGET_MB", PAGED_BUDGET_BYTES // (1024 * 1024))
+    return int(eager_mb) * 1024 * 1024, int(paged_mb) * 1024 * 1024
+
+# Seconds a cached table stays valid; changes made outside this process (e.g. the CLI) show up after this
+def cache_ttl_seconds():
+    return int(st.secrets.get("TABLE_CACHE_TTL_SECONDS", 600))
+
+# Function to fetch a table only after checking its estimated size against the memory budgets.
+# Returns the DataFrame (the whole slice or one page of it), or None when only an aggregated
+# preview was shown because the slice is too large to load.
+# Results are cached per user session and patched from the change feed instead of re-pulled.
+def guarded_fetch(table_name, where_clause=None, order_by=None, page_size=10000):
+    import time
+    import pandas as pd
+    from change_feed import latest_watermark, changes_since, apply_change_events
+    from override_engine import (
+        estimate_table_slice,
+        choose_fetch_mode,
+        fetch_table_slice,
+        fetch_aggregated_preview,
+    )
+
+    session = get_session()
+    table_cache = st.session_state.setdefault("table_cache", {})
+    cache_key = (table_name.upper(), where_clause, tuple(order_by or []))
+    entry = table_cache.get(cache_key)
+
+    # Bring a cached entry up to date with other sessions' submits, or drop it
+    if entry is not None:
+        events, watermark = changes_since(table_name, entry['watermark'])
+        expired = time.time() - entry['loaded_at'] > cache_ttl_seconds()
+        if expired or events is None or not all(apply_change_events(df, events) for df in entry['pages'].values()):
+            entry = None
+        else:
+            entry['watermark'] = watermark
+
+    if entry is None:
+        try:
+            watermark = latest_watermark(table_name)
+            estimate = estimate_table_slice(session, table_name, where_clause)
+            eager_budget, paged_budget = fetch_budgets()
+            mode = choose_fetch_mode(estimate, eager_budget, paged_budget)
+        except Exception as e:
+            st.error(f"Error estimating size of {table_name}: {e}")
+            return pd.DataFrame()
+        entry = {"estimate": estimate, "mode": mode, "watermark": watermark, "loaded_at": time.time(), "pages": {}}
+        table_cache[cache_key] = entry
+
+    estimate, mode = entry['estimate'], entry['mode']
+
+    # Pages fetched with LIMIT/OFFSET only line up under a fixed ordering
+    if mode == "paged" and not order_by:
+        mode = "aggregated"
+
+    stored = f"{estimate['bytes'] / 1_000_000:,.1f} MB in Snowflake" if estimate['bytes'] is not None else "size from column types"
+    st.caption(
+        f"📏 Estimated {estimate['rows']:,} rows, {stored} "
+        f"(~{estimate['memory_bytes'] / 1_000_000:,.1f} MB in memory) • {mode} mode"
+    )
+
+    try:
+        if mode == "eager":
+            if 1 not in entry['pages']:
+                entry['pages'][1] = fetch_table_slice(session, table_name, where_clause, order_by)
+            return entry['pages'][1]
+
+        if mode == "paged":
+            page_count = max((estimate['rows'] + page_size - 1) // page_size, 1)
+            page = st.number_input(f"Page (of {page_count})", min_value=1, max_value=page_count, value=1,
+                                   key=f"page_{table_name}")
+            if page not in entry['pages']:
+                entry['pages'][page] = fetch_table_slice(session, table_name, where_clause, order_by,
+                                                         limit=page_size, offset=(page - 1) * page_size)
+            return entry['pages'][page]
+
+        st.warning(f"{table_name} is too large to load here; showing a column summary computed in Snowflake.")
+        st.dataframe(fetch_aggregated_preview(session, table_name, where_clause), use_container_width=True)
+        return None
+    except Exception as e:
+        st.error(f"Error fetching data from {table_name}: {e}")
+        return pd.DataFrame()
+
+# Summary of the editable amount by group, aggregated in Snowflake, with drill-down into one group
+def render_summary(source_table, target_table, editable_column, key_columns):
+    from override_engine import (
+        fetch_table_metadata,
+        summarize_overrides,
+        top_override_changes,
+        fetch_group_rows,
+    )
+
+    session = get_session()
+    editable_column = editable_column.upper()
+    try:
+        source_columns = list(fetch_table_metadata(session, source_table)['COLUMN_NAME'])
+        target_columns = set(fetch_table_metadata(session, target_table)['COLUMN_NAME'])
+    except Exception as e:
+        st.error(f"Error fetching columns of {source_table} and {target_table}: {e}")
+        return
+
+    # Group only by columns both tables have (overrides are grouped in the target); default to the usual reporting dimensions
+    group_options = [col for col in source_columns
+                     if col in target_columns and col not in [editable_column, 'RECORD_FLAG', 'INSERT_TS', 'AS_AT_DATE']]
+    default_groups = [col for col in ['ASOFDATE', 'AS_OF_DATE', 'SEGMENT', 'CATEGORY'] if col in group_options]
+    group_by = st.multiselect("Group By", group_options, default=default_groups, key=f"summary_group_{source_table}")
+    if not group_by:
+        st.info("Select at least one column to group by.")
+        return
+
+    try:
+        summary_df = summarize_overrides(session, source_table, target_table, editable_column, group_by, key_columns)
+    except Exception as e:
+        st.error(f"Error summarizing {source_table}: {e}")
+        return
+
+    st.write(f"📊 **{editable_column} by {', '.join(group_by)}** (largest override deltas first)")
+    st.dataframe(summary_df, use_container_width=True)
+
+    st.write("🔝 **Top Override Changes**")
+    top_n = st.number_input("Top N", min_value=5, max_value=500, value=20, key=f"summary_top_{source_table}")
+    try:
+        st.dataframe(top_override_changes(session, target_table, editable_column, top_n), use_container_width=True)
+    except Exception as e:
+        st.error(f"Error fetching top changes from {target_table}: {e}")
+
+    if summary_df.empty:
+        return
+
+    # Drill down: fetch only the rows behind the selected group
+    st.write("🔍 **Drill Down**")
+    group_labels = [" | ".join(str(value) for value in row) for row in summary_df[group_by].itertuples(index=False)]
+    selected = st.selectbox("Group", range(len(group_labels)), format_func=lambda i: group_labels[i],
+                            key=f"summary_drill_{source_table}")
+    group_values = summary_df[group_by].iloc[selected].to_dict()
+    try:
+        st.dataframe(fetch_group_rows(session, source_table, group_values, key_columns), use_container_width=True)
+        st.write("Overrides in this group:")
+        st.dataframe(top_override_changes(session, target_table, editable_column, 1000, group_values),
+                     use_container_width=True)
+    except Exception as e:
+        st.error(f"Error fetching rows for the selected group: {e}")
+
+# Point-in-time view of a source table, reconstructed in Snowflake for the requested keys and range
+def render_as_of(source_table, target_table, editable_column, key_columns):
+    from datetime import time as day_time
+    from override_engine import fetch_table_metadata, reconstruct_as_of
+
+    session = get_session()
+    editable_column = editable_column.upper()
+
+    col1, col2 = st.columns(2)
+    as_of_date = col1.date_input("As Of Date", key=f"as_of_date_{source_table}")
+    as_of_time = col2.time_input("As Of Time", value=day_time(23, 59, 59), key=f"as_of_time_{source_table}")
+    as_of = datetime.combine(as_of_date, as_of_time)
+
+    method = st.radio("Reconstruct From", ["Audit Trail", "Time Travel"], horizontal=True,
+                      key=f"as_of_method_{source_table}")
+
+    # Key filters (blank means any value)
+    key_filters = {}
+    filter_columns = st.columns(len(key_columns))
+    for column, key in zip(filter_columns, key_columns):
+        value = column.text_input(key, key=f"as_of_key_{source_table}_{key}").strip()
+        if value:
+            key_filters[key] = [item.strip() for item in value.split(",")] if "," in value else value
+
+    # Optional range on a date column (e.g. the business date)
+    range_filter = None
+    try:
+        metadata_df = fetch_table_metadata(session, source_table)
+    except Exception as e:
+        st.error(f"Error fetching columns of {source_table}: {e}")
+        return
+    date_columns = list(metadata_df.loc[metadata_df['DATA_TYPE'].str.upper().str.startswith("DATE"), 'COLUMN_NAME'])
+    if date_columns:
+        range_column = st.selectbox("Date Range Column", ["(none)"] + date_columns, key=f"as_of_range_{source_table}")
+        if range_column != "(none)":
+            col1, col2 = st.columns(2)
+            range_start = col1.date_input("From", value=None, key=f"as_of_from_{source_table}")
+            range_end = col2.date_input("To", value=None, key=f"as_of_to_{source_table}")
+            range_filter = (range_column, range_start, range_end)
+
+    limit = st.number_input("Row Limit", min_value=100, max_value=100000, value=10000, step=1000,
+                            key=f"as_of_limit_{source_table}")
+
+    if st.button("Show As Of", key=f"as_of_button_{source_table}"):
+        try:
+            as_of_df = reconstruct_as_of(
+                session, source_table, target_table, editable_column, key_columns, as_of,
+                key_filters, range_filter, "time_travel" if method == "Time Travel" else "audit", limit
+            )
+        except Exception as e:
+            st.error(f"Error reconstructing {source_table} as of {as_of}: {e}")
+            return
+        st.write(f"🕰️ **{source_table} as of {as_of:%Y-%m-%d %H:%M:%S}** ({len(as_of_df):,} rows)")
+        st.dataframe(as_of_df, use_container_width=True)
+
+# Revert a submitted override batch (or every override in a time window) with set-based statements
+def render_revert(source_table, target_table, editable_column, key_columns):
+    from change_feed import publish_reload
+    from override_engine import list_override_batches, revert_overrides
+
+    session = get_session()
+    editable_column = editable_column.upper()
+    try:
+        batches_df = list_override_batches(session, target_table, editable_column)
+    except Exception as e:
+        st.error(f"Error listing override batches in {target_table}: {e}")
+        return
+
+    st.write("↩️ **Recent Override Batches**")
+    st.dataframe(batches_df, use_container_width=True)
+
+    revert_by = st.radio("Revert", ["Batch", "Time Window"], horizontal=True, key=f"revert_by_{source_table}")
+    if revert_by == "Batch":
+        if batches_df.empty:
+            st.info(f"No active overrides in {target_table}.")
+            return
+        batch_ts = st.selectbox("Batch", batches_df['BATCH_TS'], key=f"revert_batch_{source_table}")
+        window_start = window_end = batch_ts
+    else:
+        col1, col2 = st.columns(2)
+        window_start = datetime.combine(col1.date_input("From Date", key=f"revert_from_date_{source_table}"),
+                                        col1.time_input("From Time", key=f"revert_from_time_{source_table}"))
+        window_end = datetime.combine(col2.date_input("To Date", key=f"revert_to_date_{source_table}"),
+                                      col2.time_input("To Time", key=f"revert_to_time_{source_table}"))
+
+    col1, col2 = st.columns(2)
+    preview = col1.button("Preview Revert", key=f"revert_preview_{source_table}")
+    confirm = col2.button("Revert Overrides", key=f"revert_apply_{source_table}")
+    if not (preview or confirm):
+        return
+
+    try:
+        result = revert_overrides(session, source_table, target_table, editable_column, key_columns,
+                                  window_start, window_end, dry_run=not confirm)
+    except Exception as e:
+        st.error(f"❌ Error reverting overrides: {e}")
+        return
+
+    if result['conflicts']:
+        st.warning(f"{result['conflicts']} keys were overridden again since and will not be reverted.")
+    if result['no_net_change']:
+        st.info(f"{result['no_net_change']} keys end the window at their starting value; nothing to revert for them.")
+    if result['no_source_row']:
+        st.warning(f"{result['no_source_row']} keys no longer have an active source row and will not be reverted.")
+    if not confirm:
+        st.info(f"{result['revertable']} keys would be reverted.")
+    elif result['revertable'] == 0:
+        st.info("Nothing to revert.")
+    else:
+        publish_reload(source_table)
+        publish_reload(target_table)
+        st.session_state.last_update_time = datetime.now().strftime('%B %d, %Y %H:%M:%S')
+        st.success(f"✅ {result['reverted']} overrides reverted!")
+
+# Function to fetch override ref data, filtered in Snowflake to the selected module if provided
+def fetch_override_ref_data(selected_module=None):
+    import pandas as pd
+
+    try:
+        query = "SELECT * FROM Override_Ref"
+        if selected_module:
+            query += f" WHERE module = {int(selected_module)}"
+        df = get_session().sql(query).to_pandas()
+        df.columns = [col.upper() for col in df.columns]
+        return df
+    except Exception as e:
+        st.error(f"Error fetching data from Override_Ref: {e}")
+        return pd.DataFrame()
+
+# Function to update record flag in source table
+def update_source_table_record_flag(source_table, primary_key_values):
+    from override_engine import sql_literal
+
+    try:
+        where_clause = " AND ".join([f"{col} = {sql_literal(val)}" for col, val in primary_key_values.items()])
+        update_sql = f"""
+            UPDATE {source_table}
+            SET record_flag = 'D',
+                insert_ts = CURRENT_TIMESTAMP()
+            WHERE {where_clause}
+        """
+        get_session().sql(update_sql).collect()
+    except Exception as e:
+        st.error(f"Error updating record flag in {source_table}: {e}")
+        raise
+
+# Function to insert new row in source table
+def insert_into_source_table(source_table, row_data, new_value, editable_column):
+    import pandas as pd
+    from override_engine import sql_literal
+
+    try:
+        # Create a copy of row_data to avoid modifying the original DataFrame
+        row_data_copy = row_data.copy()
+
+        # Remove the editable column from the copied dictionary
+        if editable_column.upper() in row_data_copy:
+            del row_data_copy[editable_column.upper()]
+
+        # Remove the RECORD_FLAG column from the copied dictionary
+        if 'RECORD_FLAG' in row_data_copy:
+            del row_data_copy['RECORD_FLAG']
+
+        # Remove the INSERT_TS column from the copied dictionary
+        if 'INSERT_TS' in row_data_copy:
+            del row_data_copy['INSERT_TS']
+
+        columns = ", ".join(row_data_copy.keys())
+
+        # Properly format the values based on their type
+        formatted_values = []
+        for col, val in row_data_copy.items():
+            if isinstance(val, str):
+                formatted_values.append(f"'{val}'")
+            elif pd.isna(val):  # Handle potential NaN values, converting to NULL
+                formatted_values.append("NULL")
+            elif isinstance(val, (int, float)):
+                formatted_values.append(str(val))
+            elif isinstance(val, pd.Timestamp):  # Format Timestamp
+                formatted_values.append(f"'{val.strftime('%Y-%m-%d %H:%M:%S')}'")  # Snowflake TIMESTAMP format
+            elif isinstance(val, datetime):  # Format datetime object
+                formatted_values.append(f"'{val.strftime('%Y-%m-%d %H:%M:%S')}'")
+            else:
+                formatted_values.append(f"'{str(val)}'")  # Default to string if unknown type
+
+        values = ", ".join(formatted_values)
+
+        insert_sql = f"""
+            INSERT INTO {source_table} ({columns}, {editable_column}, record_flag, insert_ts)
+            VALUES ({values}, {sql_literal(new_value)}, 'A', CURRENT_TIMESTAMP())
+        """
+        get_session().sql(insert_sql).collect()
+    except Exception as e:
+        st.error(f"Error inserting into {source_table}: {e}")
+        raise
+
+# Function to insert into override table
+def insert_into_override_table(target_table, asofdate, segment, category, src_ins_ts, amount_old, amount_new):
+    from override_engine import sql_literal
+
+    try:
+        # sql_literal writes empty values (e.g. a cell that was empty before the override) as NULL
+        values = ", ".join([sql_literal(value) for value in [asofdate, segment, category, src_ins_ts, amount_old, amount_new]])
+        insert_sql = f"""
+            INSERT INTO {target_table} (asofdate, segment, category, src_ins_ts, amount_old, amount_new, insert_ts, record_flag)
+            VALUES ({values}, CURRENT_TIMESTAMP(), 'O')
+        """
+        get_session().sql(insert_sql).collect()
+    except Exception as e:
+        st.error(f"Error inserting into {target_table}: {e}")
+        raise
+
+# Display the last update timestamp in the footer
+def last_update_footer():
+    st.markdown("---")
+    last_update_time = st.session_state.get('last_update_time', "N/A")
+    st.caption(f"Portfolio Performance Override System • Last updated: {last_update_time}")
+
+# Main override dashboard shared by app.py and CalPERS.py.
+# primary_keys_by_table maps each supported source table to its primary key columns.
+def run_override_app(module_number, primary_keys_by_table):
+    import pandas as pd
+    from override_engine import fetch_table_metadata, timestamp_column, validate_changes, validation_rules_from_ref
+    from change_feed import publish_reload
+
+    # Get tables for the selected module
+    module_tables_df = fetch_override_ref_data(module_number)
+
+    if module_tables_df.empty:
+        st.warning("No tables found for the selected module in Override_Ref table.")
+        st.stop()
+
+    # Get the module name from the Override_Ref table
+    module_name = module_tables_df['MODULE_NAME'].iloc[0]
+
+    # Display the module name in a light ice blue box
+    st.markdown(f"""
+        <div style="background-color: #E0F7FA; padding: 10px; border-radius: 5px; text-align: center; font-size: 16px;">
+            <strong>Module:</strong> {module_name}
+        </div>
+    """, unsafe_allow_html=True)
+
+    available_tables = module_tables_df['SOURCE_TABLE'].unique()  # Get source tables based on module
+
+    # Add select table box
+    selected_table = st.selectbox("Select Table", available_tables)
+
+    # Filter Override_Ref data based on the selected table
+    table_info_df = module_tables_df[module_tables_df['SOURCE_TABLE'] == selected_table]
+
+    if table_info_df.empty:
+        st.warning("No table information found in Override_Ref for the selected table.")
+        last_update_footer()
+        return
+
+    target_table_name = table_info_df['TARGET_TABLE'].iloc[0]
+    editable_column = table_info_df['EDITABLE_COLUMN'].iloc[0]
+    editable_column_upper = editable_column.upper()
+
+    # Display the editable column in a disabled selectbox
+    st.selectbox("Editable Column", [editable_column], disabled=True, key="editable_column_selectbox")
+
+    # Display the editable column label below the selectbox
+    st.markdown(f"**Editable Column:** {editable_column_upper}")
+
+    # Determine primary key columns dynamically based on selected_table
+    if selected_table in primary_keys_by_table:
+        primary_key_cols = primary_keys_by_table[selected_table]
+    else:
+        st.error("Primary key columns not defined for this table. Please update the code.")
+        st.stop()
+
+    # Split the data into two tabs
+    tab1, tab2, tab3, tab4, tab5 = st.tabs(["Source Data", "Overridden Values", "Summary", "As Of", "Revert"])
+
+    with tab1:
+        st.subheader(f"Source Data from {selected_table}")
+
+        # Fetch data at the beginning, retaining only 'A' records (filtered in Snowflake)
+        source_df = guarded_fetch(selected_table, "RECORD_FLAG = 'A'", primary_key_cols)
+        if source_df is None:
+            st.info("Narrow the data in Snowflake to edit it here.")
+        elif not source_df.empty:
+
+            # Make the dataframe editable using st.data_editor
+            edited_df = source_df.copy()
+
+            # Modify column header to add pencil icon in the editable column
+            edited_df = edited_df.rename(columns={editable_column_upper: f"{editable_column_upper} ✏️"})
+
+            # Apply a background color to the editable column
+            def highlight_editable_column(df, column_name):
+                styled_df = pd.DataFrame('', index=df.index, columns=df.columns)
+                styled_df[column_name] = 'background-color: #FFFFE0'  # Light yellow background
+                return styled_df
+
+            # Disable editing for all columns except the selected editable column
+            disabled_cols = [col for col in edited_df.columns if col != f"{editable_column_upper} ✏️"]
+
+            styled_df = edited_df.style.apply(highlight_editable_column, column_name=f"{editable_column_upper} ✏️", axis=None)
+
+            edited_df = st.data_editor(
+                styled_df,  # Pass the styled dataframe
+                key=f"data_editor_{selected_table}_{editable_column}",
+                num_rows="dynamic",
+                use_container_width=True,
+                disabled=disabled_cols
+            )
+
+            # Submit button to update the source table and insert to the target table
+            if st.button("Submit Updates"):
+                try:
+                    # Identify rows that have been edited (cells empty before and after are unchanged)
+                    edited_values = edited_df[f"{editable_column_upper} ✏️"]
+                    changed_rows = edited_df[(edited_values != source_df[editable_column_upper])
+                                             & ~(edited_values.isna() & source_df[editable_column_upper].isna())]
+
+                    # Validate every edited value before sending any statement.
+                    # The per-row statements below cannot write NULL, so empty values are always rejected here.
+                    changes_df = changed_rows.rename(columns={f"{editable_column_upper} ✏️": editable_column_upper})
+                    validation_errors, validated_df = validate_changes(
+                        changes_df,
+                        fetch_table_metadata(get_session(), selected_table),
+                        editable_column_upper,
+                        primary_key_cols,
+                        dict(validation_rules_from_ref(table_info_df.iloc[0]), allow_null=False),
+                        location="row"
+                    )
+
+                    if validation_errors:
+                        for error in validation_errors:
+                            st.error(f"❌ {error}")
+                        st.warning("No changes were submitted. Fix the values above and submit again.")
+                    elif not changed_rows.empty:
+                        # Write every row in one transaction, so a failure leaves nothing half written
+                        session = get_session()
+                        session.sql("BEGIN").collect()
+                        try:
+                            for index, row in changed_rows.iterrows():
+                                # Extract primary key values
+                                primary_key_values = {col: row[col] for col in primary_key_cols}
+
+                                # Get new value for the selected column
+                                new_value = validated_df.loc[index, editable_column_upper]
+                                old_value = source_df.loc[index, editable_column_upper]
+
+                                # Get the old insert timestamp
+                                src_ins_ts = source_df.loc[index, 'INSERT_TS']
+
+                                # Before updating we need to extract current record values from source table.
+                                asofdate = row['ASOFDATE']
+                                segment = row['SEGMENT']
+                                category = row['CATEGORY']
+
+                                # 1. Mark the old record as 'D'
+                                update_source_table_record_flag(selected_table, primary_key_values)
+
+                                # 2. Insert the new record with 'A'
+                                insert_into_source_table(selected_table, source_df.loc[index].to_dict(), new_value, editable_column)
+
+                                # 3. Insert into override table
+                                insert_into_override_table(target_table_name, asofdate, segment, category, src_ins_ts, old_value, new_value)
+
+                            session.sql("COMMIT").collect()
+                        except Exception:
+                            # Nothing was written, so there is nothing to tell other sessions
+                            session.sql("ROLLBACK").collect()
+                            raise
+
+                        # Every row was written. The new rows also carry a new INSERT_TS, which later overrides copy
+                        # into SRC_INS_TS, so other sessions reload the table rather than patch only the edited column.
+                        publish_reload(selected_table)
+                        publish_reload(target_table_name)
+
+                        # Capture the current timestamp and store it in session state
+                        current_timestamp = datetime.now().strftime('%B %d, %Y %H:%M:%S')
+                        st.session_state.last_update_time = current_timestamp
+
+                        st.success("Data updated successfully!")
+                    else:
+                        st.info("No changes were made.")
+
+                except Exception as e:
+                    st.error(f"Error during update/insert: {e}")
+        else:
+            st.info(f"No data available in {selected_table}.")
+    with tab2:
+        st.subheader(f"Overridden Values from {target_table_name}")
+
+        # Fetch overridden data, ordered by key and insert time so large tables page consistently
+        try:
+            override_order = primary_key_cols + [timestamp_column(fetch_table_metadata(get_session(), target_table_name))]
+        except Exception:
+            override_order = None
+        override_df = guarded_fetch(target_table_name, order_by=override_order)
+        if override_df is not None and not override_df.empty:
+            st.dataframe(override_df, use_container_width=True)
+        elif override_df is not None:
+            st.info(f"No overridden data available in {target_table_name}.")
+    with tab3:
+        st.subheader(f"Summary of {editable_column_upper}")
+        render_summary(selected_table, target_table_name, editable_column, primary_key_cols)
+    with tab4:
+        st.subheader(f"{selected_table} As Of")
+        render_as_of(selected_table, target_table_name, editable_column, primary_key_cols)
+    with tab5:
+        st.subheader(f"Revert Overrides in {target_table_name}")
+        render_revert(selected_table, target_table_name, editable_column, primary_key_cols)
+
+    last_update_footer()
@@ -0,0 +1,116 @@
+import datetime
+import threading
+import time
+from collections import deque
+
+import pandas as pd
+
+# In-process change feed shared by every Streamlit session served by this process.
+# A committed submit publishes the keys and new values it wrote; other sessions poll
+# by watermark and patch their cached DataFrames instead of re-pulling whole tables.
+# Module state lives as long as the process, so it is shared across reruns and users.
+
+# Events kept per table; a session whose watermark falls behind this history reloads
+HISTORY_SIZE = 1000
+
+_lock = threading.Lock()
+_sequence = 0
+_events = {}
+_evicted = {}
+
+
+# Function to append an event to a table's history and return its sequence number
+def _publish(table_name, event):
+    global _sequence
+    with _lock:
+        _sequence += 1
+        event.update({"seq": _sequence, "published_at": time.time()})
+        history = _events.setdefault(table_name.upper(), deque(maxlen=HISTORY_SIZE))
+        if len(history) == HISTORY_SIZE:
+            # Remember the newest event dropped from the history
+            _evicted[table_name.upper()] = history[0]["seq"]
+        history.append(event)
+        return _sequence
+
+
+# Function to publish new values of one column for the given keys
+def publish_changes(table_name, key_columns, value_column, changes_df):
+    if changes_df is None or changes_df.empty:
+        return latest_watermark(table_name)
+    changes = changes_df[key_columns + [value_column]].reset_index(drop=True).copy()
+    return _publish(table_name, {"type": "update", "keys": key_columns, "column": value_column, "changes": changes})
+
+
+# Function to tell other sessions a table changed in a way they cannot patch (e.g. appended audit rows)
+def publish_reload(table_name):
+    return _publish(table_name, {"type": "reload"})
+
+
+# Function to get the latest sequence number published for a table
+def latest_watermark(table_name):
+    with _lock:
+        history = _events.get(table_name.upper())
+        return history[-1]["seq"] if history else 0
+
+
+# Function to get the events published after a watermark.
+# Returns (events, new_watermark); events is None when the history no longer reaches back that far.
+def changes_since(table_name, watermark):
+    with _lock:
+        history = list(_events.get(table_name.upper(), []))
+        evicted = _evicted.get(table_name.upper(), 0)
+    if watermark < evicted:
+        return None, history[-1]["seq"]
+    events = [event for event in history if event["seq"] > watermark]
+    return events, (events[-1]["seq"] if events else watermark)
+
+
+# Function to convert published key values to the type of the cached key column
+# (e.g. Excel timestamps to the datetime.date values Snowflake DATE columns load as)
+def _cast_like(values, cached):
+    if pd.api.types.is_datetime64_any_dtype(cached):
+        return pd.to_datetime(values).astype(cached.dtype)
+    if pd.api.types.is_bool_dtype(cached):
+        return values.astype(bool)
+    if pd.api.types.is_numeric_dtype(cached):
+        numbers = pd.to_numeric(values)
+        cast = numbers.astype(cached.dtype)
+        # A key that changes when cast (e.g. 2.7 to an integer column) cannot be in the cache
+        if not (cast == numbers).all():
+            raise ValueError("Published keys do not fit the cached key type")
+        return cast
+    sample = cached.dropna()
+    if sample.empty:
+        return values
+    if isinstance(sample.iloc[0], datetime.datetime):
+        return pd.Series(pd.to_datetime(values).dt.to_pydatetime(), index=values.index, dtype=object)
+    if isinstance(sample.iloc[0], datetime.date):
+        return pd.to_datetime(values).dt.date.astype(object)
+    if isinstance(sample.iloc[0], str):
+        return values.astype(str).astype(object)
+    return values
+
+
+# Function to patch a cached DataFrame in place with update events; returns False if a reload is needed
+def apply_change_events(df, events):
+    for event in events:
+        if event["type"] == "reload":
+            return False
+
+        keys, column, changes = event["keys"], event["column"], event["changes"]
+        if column not in df.columns or any(key not in df.columns for key in keys):
+            return False
+
+        # Cast the published keys to the cached column types so file and Snowflake values compare equal
+        cached_keys = df[keys].reset_index(drop=True)
+        try:
+            change_keys = pd.DataFrame({key: _cast_like(changes[key], cached_keys[key]) for key in keys})
+        except (TypeError, ValueError):
+            return False
+        change_keys[column] = changes[column].values
+        merged = cached_keys.merge(change_keys, on=keys, how="left", indicator=True)
+
+        matched = (merged["_merge"] == "both").values
+        if matched.any():
+            df.loc[df.index[matched], column] = merged.loc[matched, column].values
+    return True
@@ -0,0 +1,308 @@
+import argparse
+import json
+import os
+import re
+import sys
+
+import pandas as pd
+
+from override_engine import QUERY_TAG, fetch_table_metadata, resolve_table_name, sql_literal
+
+# Clustering advisor for the tables listed in Override_Ref.
+# Reads this app's query log (queries tagged with QUERY_TAG), counts which columns its
+# predicates and joins filter on, checks clustering depth and partition pruning of each
+# source/target table, and recommends (or applies) a clustering key. Pruning figures are
+# saved to a baseline file with the time the key was applied, so a later run can report partitions
+# scanned before and after (after figures only count queries that ran since the key was applied).
+#
+# Example:
+#   python clustering_advisor.py --days 14
+#   python clustering_advisor.py --apply fact_portfolio_perf
+#   python clustering_advisor.py            (later: compares against the saved baseline)
+
+BASELINE_FILE = "clustering_baseline.json"
+
+# Query tag of the advisor's own session, so its sampling and EXPLAIN queries are not read back as app traffic
+ADVISOR_QUERY_TAG = "override_app_advisor"
+
+# Tables with fewer micro-partitions than this gain little from clustering
+MIN_PARTITIONS = 100
+
+# Columns the override apps filter or join on when the table has them (besides Override_Ref JOINING_KEYS)
+DEFAULT_FILTER_COLUMNS = ['RECORD_FLAG', 'ASOFDATE', 'AS_OF_DATE', 'SEGMENT', 'CATEGORY']
+
+
+# Function to list the source and target tables of every Override_Ref module with their key columns
+def fetch_override_tables(session):
+    ref_df = session.sql("SELECT * FROM Override_Ref").to_pandas()
+    ref_df.columns = [col.upper() for col in ref_df.columns]
+
+    tables = {}
+    for _, ref_row in ref_df.iterrows():
+        joining_keys = ref_row.get('JOINING_KEYS')
+        key_columns = ([key.strip() for key in str(joining_keys).upper().split(',')]
+                       if isinstance(joining_keys, str) and joining_keys.strip() else [])
+        for role in ['SOURCE_TABLE', 'TARGET_TABLE']:
+            table_name = str(ref_row[role]).upper()
+            tables.setdefault(table_name, {"table": table_name, "role": role.split('_')[0].lower(), "key_columns": []})
+            tables[table_name]["key_columns"] += [key for key in key_columns if key not in tables[table_name]["key_columns"]]
+    return list(tables.values())
+
+
+# Function to fetch this app's queries with their pruning statistics.
+# ACCOUNT_USAGE has partition counts but needs privileges and lags; INFORMATION_SCHEMA is the fallback.
+def fetch_app_queries(session, days=7):
+    try:
+        df = session.sql(f"""
+            SELECT QUERY_TEXT, PARTITIONS_SCANNED, PARTITIONS_TOTAL, START_TIME
+            FROM SNOWFLAKE.ACCOUNT_USAGE.QUERY_HISTORY
+            WHERE QUERY_TAG = {sql_literal(QUERY_TAG)}
+              AND START_TIME >= DATEADD(day, -{int(days)}, CURRENT_TIMESTAMP())
+              AND EXECUTION_STATUS = 'SUCCESS'
+        """).to_pandas()
+    except Exception:
+        df = session.sql(f"""
+            SELECT QUERY_TEXT, NULL AS PARTITIONS_SCANNED, NULL AS PARTITIONS_TOTAL, START_TIME
+            FROM TABLE(INFORMATION_SCHEMA.QUERY_HISTORY(
+                END_TIME_RANGE_START => DATEADD(day, -{int(days)}, CURRENT_TIMESTAMP()),
+                RESULT_LIMIT => 10000))
+            WHERE QUERY_TAG = {sql_literal(QUERY_TAG)}
+              AND EXECUTION_STATUS = 'SUCCESS'
+        """).to_pandas()
+    df.columns = [col.upper() for col in df.columns]
+    return df
+
+
+# Function to keep only the logged queries that started after a point in time
+def queries_since(queries_df, since):
+    start_times = pd.to_datetime(queries_df['START_TIME'], utc=True)
+    return queries_df[(start_times > pd.to_datetime(since, utc=True)).values]
+
+
+# Function to count, per column, the logged queries on a table that filter or join on it.
+# Only queries that read or write the table count (FROM/JOIN/UPDATE/INTO it); lookups that merely
+# mention its name, such as INFORMATION_SCHEMA queries, are left out.
+def predicate_usage(queries_df, table_name, columns):
+    _, bare_name, _ = resolve_table_name(table_name)
+    table_pattern = re.compile(rf"\b(?:FROM|JOIN|UPDATE|INTO)\s+(?:[\w\"]+\.)*\"?{re.escape(bare_name)}\b", re.IGNORECASE)
+    table_queries = queries_df[queries_df['QUERY_TEXT'].fillna("").str.contains(table_pattern)]
+
+    usage = {}
+    for col in columns:
+        predicate = re.compile(
+            rf"(?:\b(?:\w+\.)?{re.escape(col)}\b\s*(?:=|<|>|!=|<>|\bIN\b|\bBETWEEN\b|\bIS\b))"
+            rf"|(?:EQUAL_NULL\(\s*(?:\w+\.)?{re.escape(col)}\b)"
+            rf"|(?:=\s*(?:\w+\.)?{re.escape(col)}\b)",
+            re.IGNORECASE
+        )
+        usage[col] = int(table_queries['QUERY_TEXT'].str.contains(predicate).sum())
+
+    # Pruning averages only cover queries that touched micro-partitions (metadata-only queries scan none)
+    pruned_queries = table_queries[pd.to_numeric(table_queries['PARTITIONS_TOTAL'], errors="coerce").fillna(0) > 0]
+    scanned = pruned_queries['PARTITIONS_SCANNED'].dropna()
+    total = pruned_queries['PARTITIONS_TOTAL'].dropna()
+    return {
+        "queries": len(table_queries),
+        "columns": usage,
+        "avg_partitions_scanned": float(scanned.mean()) if len(scanned) else None,
+        "avg_partitions_total": float(total.mean()) if len(total) else None,
+    }
+
+
+# Function to read a table's current clustering key and size
+def table_clustering(session, table_name):
+    information_schema, bare_name, schema_condition = resolve_table_name(table_name)
+    rows = session.sql(f"""
+        SELECT CLUSTERING_KEY, ROW_COUNT, BYTES
+        FROM {information_schema}.TABLES
+        WHERE UPPER(TABLE_NAME) = '{bare_name}'
+          AND {schema_condition}
+    """).collect()
+    if not rows:
+        raise ValueError(f"Table {table_name} not found")
+    return rows[0].as_dict()
+
+
+# Function to read clustering depth and overlap of a table for the given columns
+def clustering_information(session, table_name, columns):
+    content = session.sql(
+        f"SELECT SYSTEM$CLUSTERING_INFORMATION('{table_name}', '({', '.join(columns)})')"
+    ).collect()[0][0]
+    info = json.loads(content)
+    return {
+        "total_partition_count": info.get("total_partition_count"),
+        "average_overlaps": info.get("average_overlaps"),
+        "average_depth": info.get("average_depth"),
+    }
+
+
+# Function to estimate the number of distinct values of each column
+def column_cardinality(session, table_name, columns):
+    row = session.sql(
+        f"SELECT {', '.join([f'APPROX_COUNT_DISTINCT({col}) AS {col}' for col in columns])} FROM {table_name}"
+    ).collect()[0].as_dict()
+    return {col.upper(): value for col, value in row.items()}
+
+
+# Function to choose clustering key columns: used in predicates, not near-unique, lowest cardinality first
+def recommend_clustering_key(usage, cardinality, row_count, max_columns=3):
+    candidates = [col for col, count in usage.items()
+                  if count > 0 and cardinality.get(col) and cardinality[col] <= max(row_count, 1) / 2]
+    candidates.sort(key=lambda col: (cardinality[col], -usage[col]))
+    return candidates[:max_columns]
+
+
+# Function to measure pruning of a representative app query (equality on each column) with EXPLAIN
+def probe_pruning(session, table_name, columns):
+    where_clause = "RECORD_FLAG = 'A'" if 'RECORD_FLAG' in columns else "TRUE"
+    sample = session.sql(f"SELECT {', '.join(columns)} FROM {table_name} WHERE {where_clause} LIMIT 1").collect()
+    if not sample:
+        return None
+    conditions = " AND ".join([f"{col} IS NULL" if value is None else f"{col} = {sql_literal(value)}"
+                               for col, value in sample[0].as_dict().items()])
+    plan = json.loads(session.sql(f"EXPLAIN USING JSON SELECT * FROM {table_name} WHERE {conditions}").collect()[0][0])
+    stats = plan.get("GlobalStats", {})
+    return {"partitions_assigned": stats.get("partitionsAssigned"), "partitions_total": stats.get("partitionsTotal")}
+
+
+# Function to apply a clustering key (Snowflake reclusters in the background); returns when it was applied
+def apply_clustering_key(session, table_name, columns):
+    session.sql(f"ALTER TABLE {table_name} CLUSTER BY ({', '.join(columns)})").collect()
+    return session.sql("SELECT CURRENT_TIMESTAMP()").collect()[0][0]
+
+
+# Function to analyse one table and return its recommendation and pruning figures
+def advise_table(session, table, queries_df):
+    table_name = table["table"]
+    table_columns = set(fetch_table_metadata(session, table_name)['COLUMN_NAME'])
+    columns = [col for col in dict.fromkeys(DEFAULT_FILTER_COLUMNS + table["key_columns"]) if col in table_columns]
+
+    clustering = table_clustering(session, table_name)
+    usage = predicate_usage(queries_df, table_name, columns)
+    cardinality = column_cardinality(session, table_name, columns) if columns else {}
+    recommended = recommend_clustering_key(usage["columns"], cardinality, clustering['ROW_COUNT'] or 0)
+
+    advice = {
+        "table": table_name,
+        "role": table["role"],
+        "clustering_key": clustering['CLUSTERING_KEY'],
+        "row_count": clustering['ROW_COUNT'],
+        "usage": usage,
+        "cardinality": cardinality,
+        "recommended": recommended,
+        "clustering": None,
+        "probe": None,
+    }
+    if recommended:
+        advice["clustering"] = clustering_information(session, table_name, recommended)
+        advice["probe"] = probe_pruning(session, table_name, recommended)
+
+    partitions = (advice["clustering"] or {}).get("total_partition_count") or 0
+    if not recommended:
+        advice["action"] = "No app predicates found on this table; leave it unclustered."
+    elif partitions < MIN_PARTITIONS:
+        advice["action"] = f"Only {partitions} micro-partitions; clustering would not pay for itself."
+    elif (clustering['CLUSTERING_KEY'] or "").upper().replace(" ", "") == f"LINEAR({','.join(recommended)})":
+        advice["action"] = "Already clustered on the recommended key."
+    else:
+        advice["action"] = f"CLUSTER BY ({', '.join(recommended)})"
+    return advice
+
+
+# Function to load the saved pruning baseline (figures from before a clustering key was applied)
+def load_baseline(path):
+    if not os.path.exists(path):
+        return {}
+    with open(path) as baseline_file:
+        return json.load(baseline_file)
+
+
+# Function to save pruning figures and the time the clustering key was applied as the baseline for a table
+def save_baseline(path, advice, applied_at):
+    baseline = load_baseline(path)
+    baseline[advice["table"]] = {
+        "clustering_key": advice["recommended"],
+        "applied_at": str(applied_at),
+        "avg_partitions_scanned": advice["usage"]["avg_partitions_scanned"],
+        "avg_partitions_total": advice["usage"]["avg_partitions_total"],
+        "probe": advice["probe"],
+        "average_depth": (advice["clustering"] or {}).get("average_depth"),
+    }
+    with open(path, "w") as baseline_file:
+        json.dump(baseline, baseline_file, indent=2, default=str)
+
+
+# Function to print the advice for one table, with before/after figures when a baseline exists
+# (after_usage is the predicate usage of the queries that ran since the baseline's key was applied)
+def print_advice(advice, baseline=None, after_usage=None):
+    usage = advice["usage"]
+    print(f"{advice['table']} ({advice['role']}, {advice['row_count'] or 0:,} rows, "
+          f"clustering key: {advice['clustering_key'] or 'none'})")
+    print(f"  App queries: {usage['queries']}  predicate use: "
+          + ", ".join([f"{col}={count}" for col, count in usage['columns'].items()]))
+    if usage["avg_partitions_scanned"] is not None:
+        print(f"  Avg partitions scanned: {usage['avg_partitions_scanned']:.1f} of {usage['avg_partitions_total']:.1f}")
+    if advice["clustering"]:
+        clustering = advice["clustering"]
+        print(f"  Depth on ({', '.join(advice['recommended'])}): avg depth {clustering['average_depth']}, "
+              f"avg overlaps {clustering['average_overlaps']}, {clustering['total_partition_count']} partitions")
+    if advice["probe"]:
+        probe = advice["probe"]
+        print(f"  Probe query prunes to {probe['partitions_assigned']} of {probe['partitions_total']} partitions")
+    if baseline:
+        before_probe = baseline.get("probe") or {}
+        after_probe = advice["probe"] or {}
+        after_usage = after_usage or usage
+        print(f"  Before/after CLUSTER BY ({', '.join(baseline['clustering_key'])}) "
+              f"applied {baseline.get('applied_at', 'at an unknown time')}: "
+              f"avg scanned {baseline['avg_partitions_scanned']} -> {after_usage['avg_partitions_scanned']} "
+              f"({after_usage['queries']} queries), "
+              f"probe {before_probe.get('partitions_assigned')} -> {after_probe.get('partitions_assigned')}, "
+              f"depth {baseline['average_depth']} -> {(advice['clustering'] or {}).get('average_depth')}")
+    print(f"  Recommendation: {advice['action']}")
+
+
+def main(argv=None):
+    from override_cli import connection_parameters_from_env
+    from override_engine import create_session
+
+    parser = argparse.ArgumentParser(description="Recommend clustering keys for Override_Ref tables from the app's query log.")
+    parser.add_argument("--days", type=int, default=7, help="Days of query history to analyse")
+    parser.add_argument("--apply", nargs="*", metavar="TABLE",
+                        help="Apply the recommended key to these tables (all recommended tables if none given)")
+    parser.add_argument("--baseline", default=BASELINE_FILE, help="File holding pruning figures from before --apply")
+    args = parser.parse_args(argv)
+
+    session = create_session(connection_parameters_from_env(), ADVISOR_QUERY_TAG)
+    try:
+        queries_df = fetch_app_queries(session, args.days)
+        baseline = load_baseline(args.baseline)
+        failed_tables = []
+        for table in fetch_override_tables(session):
+            # One unreadable Override_Ref table should not end the run for the others
+            try:
+                advice = advise_table(session, table, queries_df)
+                table_baseline = baseline.get(advice["table"])
+                after_usage = None
+                if table_baseline and table_baseline.get("applied_at"):
+                    after_usage = predicate_usage(queries_since(queries_df, table_baseline["applied_at"]),
+                                                  advice["table"], list(advice["usage"]["columns"]))
+                print_advice(advice, table_baseline, after_usage)
+
+                apply_requested = args.apply is not None and (not args.apply or advice["table"] in [t.upper() for t in args.apply])
+                if apply_requested and advice["action"].startswith("CLUSTER BY"):
+                    applied_at = apply_clustering_key(session, advice["table"], advice["recommended"])
+                    save_baseline(args.baseline, advice, applied_at)
+                    print(f"  Applied {advice['action']}; baseline saved to {args.baseline}. "
+                          "Re-run after automatic clustering has caught up to see the after figures.")
+            except Exception as e:
+                failed_tables.append(table["table"])
+                print(f"{table['table']}: skipped ({e})")
+            print()
+    finally:
+        session.close()
+    return 1 if failed_tables else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
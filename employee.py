@@ -1,26 +1,10 @@
 import streamlit as st
 import pandas as pd
-from snowflake.snowpark import Session  
-from datetime import datetime
-
-# ✅ Snowflake connection parameters from Streamlit secrets
-try:
-    connection_parameters = {
-        "account": st.secrets["SNOWFLAKE_ACCOUNT"],
-        "user": st.secrets["SNOWFLAKE_USER"],
-        "password": st.secrets["SNOWFLAKE_PASSWORD"],
-        "warehouse": st.secrets["SNOWFLAKE_WAREHOUSE"],
-        "database": st.secrets["SNOWFLAKE_DATABASE"],
-        "schema": st.secrets["SNOWFLAKE_SCHEMA"],
-    }
-
-    # ✅ Create a Snowpark session
-    session = Session.builder.configs(connection_parameters).create()
-    st.success("✅ Successfully connected to Snowflake!")
-
-except Exception as e:
-    st.error(f"❌ Failed to connect to Snowflake: {e}")
-    st.stop()
+
+from app_core import get_session
+
+# ✅ Snowpark session from the shared core (logs in on first use)
+session = get_session()
 
 # Table name
 table_name = "EMPLOYEE"
@@ -0,0 +1,115 @@
+import argparse
+import os
+import sys
+
+from override_engine import create_session, fetch_override_config, read_override_file, revert_overrides, run_override
+
+# Command line entry point for applying overrides without Streamlit.
+#
+# Example:
+#   python override_cli.py --module 1 --file changes.csv --dry-run
+#   python override_cli.py --module 2 --source-table portfolio_perf --file changes.xlsx
+#   python override_cli.py --module 1 --revert-from "2025-03-31 17:02:11.123"
+#
+# Connection details are read from the same names used in Streamlit secrets,
+# as environment variables (SNOWFLAKE_ACCOUNT, SNOWFLAKE_USER, ...).
+
+CONNECTION_SETTINGS = {
+    "account": "SNOWFLAKE_ACCOUNT",
+    "user": "SNOWFLAKE_USER",
+    "password": "SNOWFLAKE_PASSWORD",
+    "warehouse": "SNOWFLAKE_WAREHOUSE",
+    "database": "SNOWFLAKE_DATABASE",
+    "schema": "SNOWFLAKE_SCHEMA",
+}
+
+
+# Function to build Snowflake connection parameters from environment variables
+def connection_parameters_from_env():
+    missing = [name for name in CONNECTION_SETTINGS.values() if not os.environ.get(name)]
+    if missing:
+        raise SystemExit(f"Missing environment variables: {', '.join(missing)}")
+    return {key: os.environ[name] for key, name in CONNECTION_SETTINGS.items()}
+
+
+# Function to print the outcome of an override run
+def print_report(result):
+    config = result['config']
+    print(f"Module {config['module']}: {config['source_table']} -> {config['target_table']} ({config['editable_column']})")
+
+    if result['errors']:
+        print("Validation failed:")
+        for error in result['errors']:
+            print(f"  - {error}")
+        return
+
+    counts = result['counts']
+    print(f"File rows: {counts['FILE_ROWS']}  Changed rows: {counts['CHANGED_ROWS']}  Unmatched keys: {counts['UNMATCHED_ROWS']}")
+
+    statements = result['statements']
+    executed = [entry for entry in statements if entry['executed']]
+    print(f"Statements: {len(statements)} total, {len(executed)} executed, {len(statements) - len(executed)} skipped")
+    for entry in statements:
+        seconds = f"{entry['seconds']:.3f}s" if entry['seconds'] is not None else "skipped"
+        print(f"  {entry['step']:<28} {seconds}")
+
+    print("Timings:")
+    for phase, seconds in result['timings'].items():
+        print(f"  {phase:<28} {seconds:.3f}s")
+
+    if result['dry_run']:
+        print(f"Dry run: {counts['CHANGED_ROWS']} overrides would be applied.")
+    else:
+        print(f"Applied {result['applied']} overrides.")
+
+
+# Function to print the outcome of a revert
+def print_revert_report(result):
+    print(f"Revertable keys: {result['revertable']}  Overridden again since: {result['conflicts']}  "
+          f"No net change: {result['no_net_change']}  No active source row: {result['no_source_row']}")
+    for entry in result['statements']:
+        seconds = f"{entry['seconds']:.3f}s" if entry['seconds'] is not None else "skipped"
+        print(f"  {entry['step']:<28} {seconds}")
+    if result['dry_run']:
+        print(f"Dry run: {result['revertable']} overrides would be reverted.")
+    else:
+        print(f"Reverted {result['reverted']} overrides.")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Apply or revert overrides for an Override_Ref module.")
+    parser.add_argument("--module", required=True, type=int, help="Module number in Override_Ref")
+    parser.add_argument("--source-table", help="Source table of the module (required when it has several)")
+    parser.add_argument("--file", help="CSV, Excel or Parquet file of joining keys and new values")
+    parser.add_argument("--revert-from", help="Revert overrides written at or after this timestamp")
+    parser.add_argument("--revert-to", help="Revert overrides written at or before this timestamp "
+                                            "(defaults to --revert-from, i.e. a single batch)")
+    parser.add_argument("--dry-run", action="store_true", help="Validate, stage and preview without writing")
+    args = parser.parse_args(argv)
+
+    if bool(args.file) == bool(args.revert_from):
+        parser.error("give either --file or --revert-from")
+
+    changes_df = read_override_file(args.file) if args.file else None
+    session = create_session(connection_parameters_from_env())
+    try:
+        if args.revert_from:
+            config = fetch_override_config(session, args.module, args.source_table)
+            result = revert_overrides(session, config['source_table'], config['target_table'],
+                                      config['editable_column'], config['join_keys'],
+                                      args.revert_from, args.revert_to or args.revert_from, dry_run=args.dry_run)
+        else:
+            result = run_override(session, args.module, changes_df, dry_run=args.dry_run,
+                                  source_table=args.source_table)
+    finally:
+        session.close()
+
+    if args.revert_from:
+        print_revert_report(result)
+        return 0
+
+    print_report(result)
+    return 1 if result['errors'] else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,864 @@
+import datetime
+import numbers
+import time
+
+import pandas as pd
+
+# Override engine shared by the Streamlit apps and the command line.
+# Nothing in this module imports streamlit, so batch jobs can use it directly.
+
+NUMERIC_TYPES = ("NUMBER", "DECIMAL", "NUMERIC", "INT", "INTEGER", "BIGINT", "SMALLINT",
+                 "FLOAT", "DOUBLE", "REAL")
+
+
+# Query tag on every app session created here, so the app's queries can be found in query history.
+# Tools that only inspect the app (diagnostics, clustering advisor) tag their sessions differently.
+QUERY_TAG = "override_app"
+
+
+# Function to create a Snowpark session (imported lazily so library users only pay for it when connecting).
+# The query tag is a login session parameter, so setting it costs no extra round trip.
+def create_session(connection_parameters, query_tag=QUERY_TAG):
+    from snowflake.snowpark import Session
+    session_parameters = dict(connection_parameters.get("session_parameters") or {}, QUERY_TAG=query_tag)
+    return Session.builder.configs(dict(connection_parameters, session_parameters=session_parameters)).create()
+
+
+# Function to run one statement and record its timing in the statement log
+def run_statement(session, statement_log, step, sql, dry_run=False, fetch="collect"):
+    entry = {"step": step, "sql": sql, "seconds": None, "executed": not dry_run}
+    statement_log.append(entry)
+    if dry_run:
+        return None
+
+    start = time.perf_counter()
+    if fetch == "pandas":
+        result = session.sql(sql).to_pandas()
+    else:
+        result = session.sql(sql).collect()
+    entry["seconds"] = time.perf_counter() - start
+    return result
+
+
+# Function to retrieve the override configuration of a module (and one of its source tables) from Override_Ref
+def fetch_override_config(session, module_number, source_table=None):
+    ref_df = session.sql(f"SELECT * FROM override_ref WHERE module = {int(module_number)}").to_pandas()
+    ref_df.columns = [col.upper() for col in ref_df.columns]
+    if ref_df.empty:
+        raise ValueError(f"No configuration data found in Override_Ref for module {module_number}")
+    return override_config_from_ref(ref_df, source_table)
+
+
+# Function to build the override configuration from Override_Ref rows.
+# A module may list several source tables; source_table picks one and is required when there is more than one.
+def override_config_from_ref(ref_df, source_table=None):
+    if source_table:
+        ref_df = ref_df[ref_df['SOURCE_TABLE'].str.upper() == str(source_table).upper()]
+        if ref_df.empty:
+            raise ValueError(f"Source table {source_table} is not configured in Override_Ref for this module")
+    if len(ref_df) > 1:
+        raise ValueError(f"Override_Ref has {len(ref_df)} rows for this module ({', '.join(ref_df['SOURCE_TABLE'])}); "
+                         "choose a source table")
+    ref_row = ref_df.iloc[0]
+    return {
+        "module": int(ref_row['MODULE']),
+        "source_table": ref_row['SOURCE_TABLE'],
+        "target_table": ref_row['TARGET_TABLE'],
+        "editable_column": ref_row['EDITABLE_COLUMN'].strip().upper(),
+        "join_keys": [key.strip() for key in ref_row['JOINING_KEYS'].strip().upper().split(',')],
+        "rules": validation_rules_from_ref(ref_row),
+    }
+
+
+# Function to read the optional per-column validation rules of an Override_Ref row
+# (MIN_VALUE, MAX_VALUE and ALLOW_NULL columns; any of them may be absent or empty)
+def validation_rules_from_ref(ref_row):
+    rules = {}
+    for column, rule in [('MIN_VALUE', 'min_value'), ('MAX_VALUE', 'max_value')]:
+        if column in ref_row.index and pd.notna(ref_row[column]):
+            rules[rule] = float(ref_row[column])
+    if 'ALLOW_NULL' in ref_row.index and pd.notna(ref_row['ALLOW_NULL']):
+        rules['allow_null'] = str(ref_row['ALLOW_NULL']).strip().upper() in ("Y", "YES", "TRUE", "1")
+    return rules
+
+
+# Function to resolve a table name, optionally qualified as [database.]schema.table, into the
+# INFORMATION_SCHEMA to query, the bare table name and the schema condition (the current schema when unqualified)
+def resolve_table_name(table_name):
+    parts = [part.strip().strip('"').upper() for part in str(table_name).split('.')]
+    information_schema = f"{parts[-3]}.INFORMATION_SCHEMA" if len(parts) >= 3 else "INFORMATION_SCHEMA"
+    schema_condition = f"TABLE_SCHEMA = '{parts[-2]}'" if len(parts) >= 2 else "TABLE_SCHEMA = CURRENT_SCHEMA()"
+    return information_schema, parts[-1], schema_condition
+
+
+# Function to fetch column names and data types of a table from INFORMATION_SCHEMA
+def fetch_table_metadata(session, table_name):
+    information_schema, bare_name, schema_condition = resolve_table_name(table_name)
+    query = f"""
+        SELECT COLUMN_NAME, DATA_TYPE, IS_NULLABLE, NUMERIC_PRECISION, NUMERIC_SCALE, CHARACTER_MAXIMUM_LENGTH
+        FROM {information_schema}.COLUMNS
+        WHERE UPPER(TABLE_NAME) = '{bare_name}'
+          AND {schema_condition}
+    """
+    metadata_df = session.sql(query).to_pandas()
+    metadata_df.columns = [col.upper() for col in metadata_df.columns]
+    metadata_df['COLUMN_NAME'] = metadata_df['COLUMN_NAME'].str.upper()
+    return metadata_df
+
+
+# Function to read an override file (CSV, Excel or Parquet) from a path or an uploaded file
+def read_override_file(override_file):
+    file_name = str(getattr(override_file, "name", override_file)).lower()
+    if file_name.endswith(".csv"):
+        changes_df = pd.read_csv(override_file)
+    elif file_name.endswith((".xlsx", ".xls")):
+        changes_df = pd.read_excel(override_file)
+    elif file_name.endswith(".parquet"):
+        changes_df = pd.read_parquet(override_file)
+    else:
+        raise ValueError(f"Unsupported file type: {file_name}")
+
+    # Convert column names to uppercase for consistency
+    changes_df.columns = [str(col).strip().upper() for col in changes_df.columns]
+    return changes_df
+
+
+# Function to identify edited rows and return their joining keys and new values
+def detect_changes(source_df, edited_df, editable_column, join_keys):
+    changed = edited_df[editable_column].ne(source_df[editable_column]) & ~(
+        edited_df[editable_column].isna() & source_df[editable_column].isna()
+    )
+    return edited_df.loc[changed, join_keys + [editable_column]].copy()
+
+
+# Function to convert values to the pandas type of a Snowflake column type; returns the converted
+# values and a mask of values that were given but do not parse (text columns are left as they are)
+def coerce_to_column_type(values, data_type):
+    if data_type in NUMERIC_TYPES:
+        converted = pd.to_numeric(values, errors="coerce")
+    elif data_type.startswith(("DATE", "TIMESTAMP")):
+        converted = pd.to_datetime(values, errors="coerce")
+    else:
+        return values, pd.Series(False, index=values.index)
+    invalid = converted.isna() & values.notna()
+    # DATE columns hold calendar dates; keep them as datetime.date so they stage and compare as dates
+    if data_type == "DATE":
+        converted = converted.dt.date.where(converted.notna(), None)
+    return converted, invalid
+
+
+# Function to validate the whole change set in one vectorized pass, before any statement is sent.
+# Every problem is reported at once; location is "line" for files (header is line 1) or "row" for editor rows.
+def validate_changes(changes_df, source_metadata, editable_column, join_keys, rules=None, location="line"):
+    errors = []
+    rules = rules or {}
+    required_columns = join_keys + [editable_column]
+
+    # The change set must carry every joining key and the editable column
+    missing_columns = [col for col in required_columns if col not in changes_df.columns]
+    if missing_columns:
+        errors.append(f"Missing required columns: {', '.join(missing_columns)}")
+        return errors, pd.DataFrame()
+
+    # The Override_Ref configuration must match the source table definition
+    source_columns = set(source_metadata['COLUMN_NAME'])
+    unknown_columns = [col for col in required_columns if col not in source_columns]
+    if unknown_columns:
+        errors.append(f"Columns not found in source table: {', '.join(unknown_columns)}")
+        return errors, pd.DataFrame()
+
+    # Keep only the key columns and the new value
+    changes_df = changes_df[required_columns].copy()
+    columns_info = source_metadata.drop_duplicates('COLUMN_NAME').set_index('COLUMN_NAME')
+    column_info = columns_info.loc[editable_column]
+    data_type = str(column_info['DATA_TYPE']).upper()
+
+    positions = changes_df.index + 2 if location == "line" else changes_df.index + 1
+
+    # Function to record one error listing the first offending lines/rows
+    def report(mask, message):
+        if mask.any():
+            errors.append(f"{message} on {location}s: {list(positions[mask])[:20]}"
+                          + (f" (+{int(mask.sum()) - 20} more)" if mask.sum() > 20 else ""))
+
+    report(changes_df[join_keys].isna().any(axis=1), "Empty joining key values")
+    # Key types: convert each joining key to its column type, so bad keys fail here rather than in Snowflake
+    for key in join_keys:
+        key_type = str(columns_info.loc[key, 'DATA_TYPE']).upper()
+        changes_df[key], invalid_keys = coerce_to_column_type(changes_df[key], key_type)
+        report(invalid_keys, f"Invalid {key} values for type {key_type}")
+
+    report(changes_df.duplicated(subset=join_keys, keep=False), "Duplicate joining keys")
+
+    new_values = changes_df[editable_column]
+    missing_values = new_values.isna()
+
+    if data_type in NUMERIC_TYPES:
+        # Type: coerce text to numbers; anything that does not parse is an error
+        new_values, invalid_values = coerce_to_column_type(new_values, data_type)
+        report(invalid_values, f"Non-numeric {editable_column} values")
+        report(new_values.isin([float("inf"), float("-inf")]), f"Infinite {editable_column} values")
+
+        # Range: the column's precision/scale and the Override_Ref limits
+        precision, scale = column_info.get('NUMERIC_PRECISION'), column_info.get('NUMERIC_SCALE')
+        if pd.notna(precision) and pd.notna(scale):
+            report(new_values.abs() >= 10 ** (int(precision) - int(scale)),
+                   f"{editable_column} values too large for NUMBER({int(precision)},{int(scale)})")
+        if 'min_value' in rules:
+            report(new_values < rules['min_value'], f"{editable_column} values below {rules['min_value']}")
+        if 'max_value' in rules:
+            report(new_values > rules['max_value'], f"{editable_column} values above {rules['max_value']}")
+    elif data_type.startswith(("DATE", "TIMESTAMP")):
+        new_values, invalid_values = coerce_to_column_type(new_values, data_type)
+        report(invalid_values, f"Invalid {editable_column} dates")
+    else:
+        max_length = column_info.get('CHARACTER_MAXIMUM_LENGTH')
+        if pd.notna(max_length):
+            report(new_values.astype(str).str.len().gt(int(max_length)) & ~missing_values,
+                   f"{editable_column} values longer than {int(max_length)} characters")
+
+    # Nullability: empty values are rejected unless Override_Ref explicitly allows them and the column is nullable
+    allow_null = rules.get('allow_null', False) and str(column_info['IS_NULLABLE']).upper() == "YES"
+    if not allow_null:
+        report(missing_values, f"Empty {editable_column} values")
+
+    changes_df[editable_column] = new_values
+    return errors, changes_df
+
+
+# Function to load the validated change set into a temporary staging table.
+# Dates and timestamps are staged as ISO strings, which Snowflake casts back exactly on comparison
+# (datetime64 columns written without logical types would arrive as raw epoch numbers).
+def stage_changes(session, changes_df, stage_table):
+    stage_df = changes_df.reset_index(drop=True)
+    for col in stage_df.columns:
+        if pd.api.types.is_datetime64_any_dtype(stage_df[col]):
+            stage_df[col] = stage_df[col].dt.strftime('%Y-%m-%d %H:%M:%S.%f')
+        elif stage_df[col].map(lambda value: isinstance(value, datetime.date)).any():
+            stage_df[col] = stage_df[col].map(lambda value: value.isoformat() if isinstance(value, datetime.date) else None)
+    session.write_pandas(
+        stage_df,
+        stage_table,
+        auto_create_table=True,
+        overwrite=True,
+        table_type="temporary"
+    )
+
+
+# Join condition and change filter shared by the preview and apply statements
+def staged_change_filter(editable_column, join_keys):
+    join_condition = " AND ".join([f"src.{key} = stg.{key}" for key in join_keys])
+    change_condition = f"src.RECORD_FLAG = 'A' AND src.{editable_column} IS DISTINCT FROM stg.{editable_column}"
+    return join_condition, change_condition
+
+
+# Function to compute the diff preview of a staged change set in Snowflake
+def preview_staged_changes(session, config, stage_table, limit=1000, statement_log=None):
+    statement_log = [] if statement_log is None else statement_log
+    source_table = config['source_table']
+    editable_column = config['editable_column']
+    join_keys = config['join_keys']
+    join_condition, change_condition = staged_change_filter(editable_column, join_keys)
+    key_columns = ", ".join([f"src.{key}" for key in join_keys])
+
+    counts_sql = f"""
+        SELECT
+            (SELECT COUNT(*) FROM {stage_table}) AS FILE_ROWS,
+            (SELECT COUNT(*)
+               FROM {source_table} src JOIN {stage_table} stg ON {join_condition}
+              WHERE {change_condition}) AS CHANGED_ROWS,
+            (SELECT COUNT(*)
+               FROM {stage_table} stg
+              WHERE NOT EXISTS (
+                    SELECT 1 FROM {source_table} src
+                     WHERE {join_condition} AND src.RECORD_FLAG = 'A')) AS UNMATCHED_ROWS
+    """
+    counts = run_statement(session, statement_log, "preview counts", counts_sql)[0].as_dict()
+
+    # Only numeric columns have a delta; dates and text are listed in key order
+    source_metadata = fetch_table_metadata(session, source_table)
+    data_type = str(source_metadata.loc[source_metadata['COLUMN_NAME'] == editable_column, 'DATA_TYPE'].iloc[0]).upper()
+    if data_type in NUMERIC_TYPES:
+        delta_column = f",\n               stg.{editable_column} - src.{editable_column} AS DELTA"
+        order_by = f"ABS(stg.{editable_column} - src.{editable_column}) DESC NULLS LAST"
+    else:
+        delta_column = ""
+        order_by = key_columns
+
+    preview_sql = f"""
+        SELECT {key_columns},
+               src.{editable_column} AS {editable_column}_OLD,
+               stg.{editable_column} AS {editable_column}_NEW{delta_column}
+        FROM {source_table} src
+        JOIN {stage_table} stg ON {join_condition}
+        WHERE {change_condition}
+        ORDER BY {order_by}
+        LIMIT {limit}
+    """
+    preview_df = run_statement(session, statement_log, "preview rows", preview_sql, fetch="pandas")
+    return counts, preview_df
+
+
+# Function to apply a staged change set as one set-based override batch.
+# Returns the number of overrides applied and the keys and new values of the rows actually changed.
+def apply_staged_changes(session, config, stage_table, dry_run=False, statement_log=None):
+    statement_log = [] if statement_log is None else statement_log
+    source_table = config['source_table']
+    target_table = config['target_table']
+    editable_column = config['editable_column']
+    join_keys = config['join_keys']
+    join_condition, change_condition = staged_change_filter(editable_column, join_keys)
+
+    source_metadata = fetch_table_metadata(session, source_table)
+    target_metadata = fetch_table_metadata(session, target_table)
+    target_columns = set(target_metadata['COLUMN_NAME'])
+
+    # Source columns copied through unchanged to the audit row and the new source row
+    target_common_columns = [col for col in source_metadata['COLUMN_NAME']
+                             if col in target_columns and col not in [editable_column, 'AS_AT_DATE', 'RECORD_FLAG', 'AS_OF_DATE']]
+    source_common_columns = [col for col in source_metadata['COLUMN_NAME']
+                             if col not in ['RECORD_FLAG', 'AS_AT_DATE', editable_column]]
+
+    # Step 1: Insert the audit rows into the target table
+    target_insert_sql = f"""
+        INSERT INTO {target_table} ({', '.join(target_common_columns + ['AS_OF_DATE', 'SRC_INS_TS', f'{editable_column}_OLD', f'{editable_column}_NEW', 'RECORD_FLAG', 'AS_AT_DATE'])})
+        SELECT {', '.join([f"src.{col}" for col in target_common_columns])},
+               src.AS_OF_DATE, src.AS_AT_DATE, src.{editable_column}, stg.{editable_column}, 'A', CURRENT_TIMESTAMP()
+        FROM {source_table} src
+        JOIN {stage_table} stg ON {join_condition}
+        WHERE {change_condition}
+    """
+
+    # Step 2: Insert the new active records into the source table
+    source_insert_sql = f"""
+        INSERT INTO {source_table} ({', '.join(source_common_columns + [editable_column, 'RECORD_FLAG', 'AS_AT_DATE'])})
+        SELECT {', '.join([f"src.{col}" for col in source_common_columns])},
+               stg.{editable_column}, 'A', CURRENT_TIMESTAMP(0)
+        FROM {source_table} src
+        JOIN {stage_table} stg ON {join_condition}
+        WHERE {change_condition}
+    """
+
+    # Step 3: Mark the replaced records as 'D' (the new rows already hold the staged value)
+    update_sql = f"""
+        UPDATE {source_table} src
+        SET record_flag = 'D'
+        FROM {stage_table} stg
+        WHERE {join_condition}
+          AND {change_condition}
+    """
+
+    # Step 0: Read the rows the batch changes (staged keys without an active source row, or with an unchanged value, are left out)
+    changed_sql = f"""
+        SELECT {', '.join([f"stg.{key}" for key in join_keys])}, stg.{editable_column}
+        FROM {source_table} src
+        JOIN {stage_table} stg ON {join_condition}
+        WHERE {change_condition}
+    """
+
+    run_statement(session, statement_log, "begin", "BEGIN", dry_run)
+    try:
+        changed_df = run_statement(session, statement_log, "read changed rows", changed_sql, dry_run, fetch="pandas")
+        result = run_statement(session, statement_log, "insert audit rows", target_insert_sql, dry_run)
+        run_statement(session, statement_log, "insert new source rows", source_insert_sql, dry_run)
+        run_statement(session, statement_log, "flag replaced source rows", update_sql, dry_run)
+        run_statement(session, statement_log, "commit", "COMMIT", dry_run)
+    except Exception:
+        session.sql("ROLLBACK").collect()
+        raise
+
+    if changed_df is None:
+        changed_df = pd.DataFrame(columns=join_keys + [editable_column])
+    else:
+        changed_df.columns = [col.upper() for col in changed_df.columns]
+    return (result[0][0] if result else 0), changed_df
+
+
+# Function to run a complete override (validate, stage, preview and apply) for one module
+def run_override(session, module_number, changes_df, dry_run=False, stage_table=None, source_table=None):
+    statement_log = []
+    timings = {}
+
+    start = time.perf_counter()
+    config = fetch_override_config(session, module_number, source_table)
+    source_metadata = fetch_table_metadata(session, config['source_table'])
+    timings["config"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    errors, changes_df = validate_changes(changes_df, source_metadata, config['editable_column'], config['join_keys'],
+                                          config['rules'])
+    timings["validate"] = time.perf_counter() - start
+    if errors:
+        return {"config": config, "errors": errors, "applied": 0, "statements": statement_log, "timings": timings}
+
+    stage_table = stage_table or f"{config['source_table']}_OVERRIDE_STAGE".upper()
+    start = time.perf_counter()
+    stage_changes(session, changes_df, stage_table)
+    timings["stage"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    counts, preview_df = preview_staged_changes(session, config, stage_table, statement_log=statement_log)
+    timings["preview"] = time.perf_counter() - start
+
+    applied = 0
+    if counts['CHANGED_ROWS'] > 0:
+        start = time.perf_counter()
+        applied, _ = apply_staged_changes(session, config, stage_table, dry_run, statement_log)
+        timings["apply"] = time.perf_counter() - start
+
+    return {
+        "config": config,
+        "errors": [],
+        "counts": counts,
+        "preview": preview_df,
+        "applied": applied,
+        "dry_run": dry_run,
+        "statements": statement_log,
+        "timings": timings,
+    }
+
+
+# Default memory budgets for materializing a table slice in pandas
+EAGER_BUDGET_BYTES = 200 * 1024 * 1024
+PAGED_BUDGET_BYTES = 2 * 1024 * 1024 * 1024
+
+# Snowflake stores compressed columnar data; pandas needs several times that in memory
+MEMORY_EXPANSION_FACTOR = 4
+
+# In-memory bytes per value when a size has to be estimated from the column types instead
+FIXED_WIDTH_VALUE_BYTES = 8
+TEXT_VALUE_OVERHEAD_BYTES = 57
+TEXT_VALUE_MAX_CHARACTERS = 256
+
+
+# Function to estimate the pandas memory of one row from the column definitions
+def estimate_row_bytes(metadata_df):
+    row_bytes = 0
+    for _, column in metadata_df.iterrows():
+        data_type = str(column['DATA_TYPE']).upper()
+        if data_type in NUMERIC_TYPES or data_type.startswith(("DATE", "TIMESTAMP", "TIME", "BOOLEAN")):
+            row_bytes += FIXED_WIDTH_VALUE_BYTES
+        else:
+            max_length = column.get('CHARACTER_MAXIMUM_LENGTH')
+            characters = min(int(max_length), TEXT_VALUE_MAX_CHARACTERS) if pd.notna(max_length) else TEXT_VALUE_MAX_CHARACTERS
+            row_bytes += TEXT_VALUE_OVERHEAD_BYTES + characters
+    return row_bytes
+
+
+# Function to estimate the rows and bytes of a (filtered) table slice before fetching it.
+# Storage statistics are used when INFORMATION_SCHEMA.TABLES has them; for views, or tables it does
+# not list, the rows are counted and the memory is estimated from the column types instead.
+def estimate_table_slice(session, table_name, where_clause=None):
+    information_schema, bare_name, schema_condition = resolve_table_name(table_name)
+    stats = session.sql(f"""
+        SELECT ROW_COUNT, BYTES
+        FROM {information_schema}.TABLES
+        WHERE UPPER(TABLE_NAME) = '{bare_name}'
+          AND {schema_condition}
+    """).collect()
+    has_storage_stats = bool(stats) and stats[0]['ROW_COUNT'] is not None and stats[0]['BYTES'] is not None
+
+    # A filtered count only reads the filter columns; an unfiltered one comes from metadata
+    if where_clause or not has_storage_stats:
+        count_sql = f"SELECT COUNT(*) FROM {table_name}" + (f" WHERE {where_clause}" if where_clause else "")
+        slice_rows = session.sql(count_sql).collect()[0][0]
+    else:
+        slice_rows = stats[0]['ROW_COUNT']
+
+    if not has_storage_stats:
+        metadata_df = fetch_table_metadata(session, table_name)
+        if metadata_df.empty:
+            raise ValueError(f"Cannot estimate the size of {table_name}: no column metadata found")
+        return {
+            "table_rows": None,
+            "table_bytes": None,
+            "rows": slice_rows,
+            "bytes": None,
+            "memory_bytes": slice_rows * estimate_row_bytes(metadata_df),
+        }
+
+    table_rows, table_bytes = stats[0]['ROW_COUNT'], stats[0]['BYTES']
+    slice_bytes = int(table_bytes * slice_rows / table_rows) if table_rows else 0
+    return {
+        "table_rows": table_rows,
+        "table_bytes": table_bytes,
+        "rows": slice_rows,
+        "bytes": slice_bytes,
+        "memory_bytes": slice_bytes * MEMORY_EXPANSION_FACTOR,
+    }
+
+
+# Function to pick how a slice should be loaded: 'eager', 'paged' or 'aggregated'
+def choose_fetch_mode(estimate, eager_budget_bytes=EAGER_BUDGET_BYTES, paged_budget_bytes=PAGED_BUDGET_BYTES):
+    if estimate['memory_bytes'] <= eager_budget_bytes:
+        return "eager"
+    if estimate['memory_bytes'] <= paged_budget_bytes:
+        return "paged"
+    return "aggregated"
+
+
+# Function to fetch a (filtered) table slice into pandas; paging (an offset) needs an ordering
+def fetch_table_slice(session, table_name, where_clause=None, order_by=None, limit=None, offset=0):
+    if offset and not order_by:
+        raise ValueError(f"Paging through {table_name} needs order_by columns")
+    query = f"SELECT * FROM {table_name}"
+    if where_clause:
+        query += f" WHERE {where_clause}"
+    if order_by:
+        query += f" ORDER BY {', '.join(order_by)}"
+    if limit:
+        query += f" LIMIT {int(limit)} OFFSET {int(offset)}"
+    df = session.sql(query).to_pandas()
+    # Convert column names to uppercase for consistency
+    df.columns = [col.strip().upper() for col in df.columns]
+    return df
+
+
+# Function to summarise every column of a slice in Snowflake instead of fetching its rows
+def fetch_aggregated_preview(session, table_name, where_clause=None):
+    metadata_df = fetch_table_metadata(session, table_name)
+    columns = list(metadata_df['COLUMN_NAME'])
+    aggregates = []
+    for col in columns:
+        aggregates += [
+            f"COUNT({col}) AS \"{col}|NON_NULL\"",
+            f"APPROX_COUNT_DISTINCT({col}) AS \"{col}|DISTINCT\"",
+            f"MIN({col})::VARCHAR AS \"{col}|MIN\"",
+            f"MAX({col})::VARCHAR AS \"{col}|MAX\"",
+        ]
+    query = f"SELECT {', '.join(aggregates)} FROM {table_name}"
+    if where_clause:
+        query += f" WHERE {where_clause}"
+    row = session.sql(query).collect()[0].as_dict()
+
+    # One output row per source column
+    return pd.DataFrame([
+        {"COLUMN": col, **{stat: row[f"{col}|{stat}"] for stat in ["NON_NULL", "DISTINCT", "MIN", "MAX"]}}
+        for col in columns
+    ])
+
+
+# Override rows that are still in effect ('O' from the per-row apps, 'A' from the batch engine)
+ACTIVE_OVERRIDE_FLAGS = ("A", "O")
+
+
+# Function to format a Python value as a SQL literal
+def sql_literal(value):
+    if value is None or (not isinstance(value, str) and pd.isna(value)):
+        return "NULL"
+    if isinstance(value, bool):
+        return "TRUE" if value else "FALSE"
+    if isinstance(value, numbers.Number):
+        return str(value)
+    return "'" + str(value).replace("'", "''") + "'"
+
+
+# Function to build a WHERE condition matching the given column values (NULL-safe)
+def match_condition(values, alias=None):
+    prefix = f"{alias}." if alias else ""
+    return " AND ".join([f"EQUAL_NULL({prefix}{col}, {sql_literal(val)})" for col, val in values.items()])
+
+
+# Function to total the editable column by group in Snowflake, with before/after override deltas.
+# Overrides are first collapsed to one value per key (before its first and after its last active
+# override), so a key overridden several times counts once in the group totals.
+def summarize_overrides(session, source_table, target_table, editable_column, group_by, key_columns, limit=500):
+    group_list = ", ".join(group_by)
+    key_group_list = ", ".join(dict.fromkeys(key_columns + group_by))
+    audit_ts = timestamp_column(fetch_table_metadata(session, target_table))
+    flags = ", ".join([sql_literal(flag) for flag in ACTIVE_OVERRIDE_FLAGS])
+    query = f"""
+        WITH src AS (
+            SELECT {group_list}, COUNT(*) AS ROW_COUNT, SUM({editable_column}) AS CURRENT_TOTAL
+            FROM {source_table}
+            WHERE RECORD_FLAG = 'A'
+            GROUP BY {group_list}
+        ), per_key AS (
+            SELECT {key_group_list},
+                   COUNT(*) AS OVERRIDE_COUNT,
+                   MIN_BY({editable_column}_OLD, {audit_ts}) AS VALUE_BEFORE,
+                   MAX_BY({editable_column}_NEW, {audit_ts}) AS VALUE_AFTER
+            FROM {target_table}
+            WHERE RECORD_FLAG IN ({flags})
+            GROUP BY {key_group_list}
+        ), ovr AS (
+            SELECT {group_list},
+                   SUM(OVERRIDE_COUNT) AS OVERRIDE_COUNT,
+                   COUNT(*) AS OVERRIDDEN_KEYS,
+                   SUM(VALUE_BEFORE) AS BEFORE_TOTAL,
+                   SUM(VALUE_AFTER) AS AFTER_TOTAL,
+                   SUM(VALUE_AFTER - VALUE_BEFORE) AS OVERRIDE_DELTA
+            FROM per_key
+            GROUP BY {group_list}
+        )
+        SELECT {', '.join([f"COALESCE(src.{col}, ovr.{col}) AS {col}" for col in group_by])},
+               COALESCE(src.ROW_COUNT, 0) AS ROW_COUNT,
+               src.CURRENT_TOTAL,
+               src.CURRENT_TOTAL - COALESCE(ovr.OVERRIDE_DELTA, 0) AS ORIGINAL_TOTAL,
+               COALESCE(ovr.OVERRIDE_COUNT, 0) AS OVERRIDE_COUNT,
+               COALESCE(ovr.OVERRIDDEN_KEYS, 0) AS OVERRIDDEN_KEYS,
+               ovr.BEFORE_TOTAL,
+               ovr.AFTER_TOTAL,
+               COALESCE(ovr.OVERRIDE_DELTA, 0) AS OVERRIDE_DELTA
+        FROM src
+        FULL OUTER JOIN ovr ON {' AND '.join([f"EQUAL_NULL(src.{col}, ovr.{col})" for col in group_by])}
+        ORDER BY ABS(COALESCE(ovr.OVERRIDE_DELTA, 0)) DESC, {', '.join([str(i + 1) for i in range(len(group_by))])}
+        LIMIT {int(limit)}
+    """
+    df = session.sql(query).to_pandas()
+    df.columns = [col.upper() for col in df.columns]
+    return df
+
+
+# Function to fetch the largest active overrides, optionally within one group
+def top_override_changes(session, target_table, editable_column, top_n=20, group_values=None):
+    flags = ", ".join([sql_literal(flag) for flag in ACTIVE_OVERRIDE_FLAGS])
+    where_clause = f"RECORD_FLAG IN ({flags})"
+    if group_values:
+        where_clause += f" AND {match_condition(group_values)}"
+    query = f"""
+        SELECT *, {editable_column}_NEW - {editable_column}_OLD AS DELTA
+        FROM {target_table}
+        WHERE {where_clause}
+        ORDER BY ABS({editable_column}_NEW - {editable_column}_OLD) DESC NULLS LAST
+        LIMIT {int(top_n)}
+    """
+    df = session.sql(query).to_pandas()
+    df.columns = [col.upper() for col in df.columns]
+    return df
+
+
+# Function to fetch only the active source rows underlying one summary group
+def fetch_group_rows(session, source_table, group_values, order_by=None, limit=1000):
+    where_clause = f"RECORD_FLAG = 'A' AND {match_condition(group_values)}"
+    return fetch_table_slice(session, source_table, where_clause, order_by, limit=limit)
+
+
+# Function to pick the insert timestamp column of a table ('AS_AT_DATE' or the per-row apps' 'INSERT_TS')
+def timestamp_column(metadata_df):
+    for col in ['AS_AT_DATE', 'INSERT_TS']:
+        if col in set(metadata_df['COLUMN_NAME']):
+            return col
+    raise ValueError("Table has neither an AS_AT_DATE nor an INSERT_TS column")
+
+
+# Function to build a filter from key values (a value or a list of values per column) and a column range
+def slice_condition(key_filters=None, range_filter=None, alias=None):
+    prefix = f"{alias}." if alias else ""
+    conditions = []
+    for col, value in (key_filters or {}).items():
+        if isinstance(value, (list, tuple, set)):
+            conditions.append(f"{prefix}{col} IN ({', '.join([sql_literal(item) for item in value])})")
+        else:
+            conditions.append(f"{prefix}{col} = {sql_literal(value)}")
+    if range_filter:
+        col, start, end = range_filter
+        if start is not None:
+            conditions.append(f"{prefix}{col} >= {sql_literal(start)}")
+        if end is not None:
+            conditions.append(f"{prefix}{col} <= {sql_literal(end)}")
+    return " AND ".join(conditions) or "TRUE"
+
+
+# Function to reconstruct the active rows of a source table as they were at a point in time.
+# method="audit" rewinds the current active rows through the override audit trail: for each key,
+# the first audit row written after the timestamp holds the value that was active at it (its *_OLD),
+# and SRC_INS_TS (insert time of the version it replaced) or the current row's insert timestamp
+# tells whether that version existed yet.
+# The range filter applies to the source rows only (the audit table may not have that column).
+# method="time_travel" reads the table with Snowflake time travel (limited to the retention period).
+def reconstruct_as_of(session, source_table, target_table, editable_column, key_columns, as_of,
+                      key_filters=None, range_filter=None, method="audit", limit=10000):
+    as_of_literal = f"{sql_literal(str(as_of))}::TIMESTAMP_NTZ"
+    order_by = ", ".join(key_columns)
+
+    if method == "time_travel":
+        query = f"""
+            SELECT *
+            FROM {source_table} AT(TIMESTAMP => {sql_literal(str(as_of))}::TIMESTAMP_LTZ)
+            WHERE RECORD_FLAG = 'A' AND {slice_condition(key_filters, range_filter)}
+            ORDER BY {order_by}
+            LIMIT {int(limit)}
+        """
+    else:
+        source_ts = timestamp_column(fetch_table_metadata(session, source_table))
+        audit_ts = timestamp_column(fetch_table_metadata(session, target_table))
+        key_match = " AND ".join([f"EQUAL_NULL(cur.{key}, later.{key})" for key in key_columns])
+        query = f"""
+            WITH cur AS (
+                SELECT *
+                FROM {source_table}
+                WHERE RECORD_FLAG = 'A' AND {slice_condition(key_filters, range_filter)}
+            ), later AS (
+                SELECT {', '.join(key_columns)},
+                       {editable_column}_OLD AS VALUE_AS_OF,
+                       SRC_INS_TS AS REPLACED_INS_TS,
+                       {audit_ts} AS NEXT_OVERRIDE_TS
+                FROM {target_table}
+                WHERE {audit_ts} > {as_of_literal} AND {slice_condition(key_filters)}
+                QUALIFY ROW_NUMBER() OVER (PARTITION BY {', '.join(key_columns)} ORDER BY {audit_ts}) = 1
+            )
+            SELECT cur.* EXCLUDE ({editable_column}),
+                   IFF(later.NEXT_OVERRIDE_TS IS NULL, cur.{editable_column}, later.VALUE_AS_OF) AS {editable_column},
+                   later.NEXT_OVERRIDE_TS
+            FROM cur
+            LEFT JOIN later ON {key_match}
+            WHERE COALESCE(later.REPLACED_INS_TS, cur.{source_ts}) <= {as_of_literal}
+            ORDER BY {', '.join([f"cur.{key}" for key in key_columns])}
+            LIMIT {int(limit)}
+        """
+    df = session.sql(query).to_pandas()
+    df.columns = [col.upper() for col in df.columns]
+    return df
+
+
+# Function to list override batches (audit rows written by one statement share a timestamp)
+def list_override_batches(session, target_table, editable_column, limit=50):
+    audit_ts = timestamp_column(fetch_table_metadata(session, target_table))
+    flags = ", ".join([sql_literal(flag) for flag in ACTIVE_OVERRIDE_FLAGS])
+    df = session.sql(f"""
+        SELECT {audit_ts} AS BATCH_TS,
+               COUNT(*) AS OVERRIDE_COUNT,
+               SUM({editable_column}_NEW - {editable_column}_OLD) AS OVERRIDE_DELTA
+        FROM {target_table}
+        WHERE RECORD_FLAG IN ({flags})
+        GROUP BY {audit_ts}
+        ORDER BY {audit_ts} DESC
+        LIMIT {int(limit)}
+    """).to_pandas()
+    df.columns = [col.upper() for col in df.columns]
+    return df
+
+
+# Function to revert every active override written in a time window (a single batch when start == end).
+# Per key, the value before the first override in the window is restored, provided the source still holds
+# the value of the last one. Skipped keys are reported by reason: overridden again since (conflicts),
+# no net change over the window, or no active source row left.
+# The statement count is fixed regardless of how many rows are reverted:
+#   stage the keys to revert, then in one transaction re-check them against the source, log 'R' audit rows,
+#   insert the restored source rows, flag the replaced source rows 'D' and flag the reverted audit rows 'D'.
+def revert_overrides(session, source_table, target_table, editable_column, key_columns, window_start, window_end,
+                     dry_run=False, statement_log=None, stage_table=None):
+    statement_log = [] if statement_log is None else statement_log
+    stage_table = stage_table or f"{source_table}_REVERT_STAGE".upper()
+    flags = ", ".join([sql_literal(flag) for flag in ACTIVE_OVERRIDE_FLAGS])
+
+    source_metadata = fetch_table_metadata(session, source_table)
+    target_metadata = fetch_table_metadata(session, target_table)
+    source_ts = timestamp_column(source_metadata)
+    audit_ts = timestamp_column(target_metadata)
+    target_columns = set(target_metadata['COLUMN_NAME'])
+
+    key_list = ", ".join(key_columns)
+    window = (f"{audit_ts} BETWEEN {sql_literal(str(window_start))}::TIMESTAMP_NTZ "
+              f"AND {sql_literal(str(window_end))}::TIMESTAMP_NTZ")
+    stage_match = " AND ".join([f"EQUAL_NULL(src.{key}, stg.{key})" for key in key_columns])
+    current_match = f"src.RECORD_FLAG = 'A' AND EQUAL_NULL(src.{editable_column}, stg.REVERTED_VALUE) AND stg.CAN_REVERT"
+
+    # Stage (DDL commits on its own in Snowflake, so it runs before the transaction; it only reads)
+    stage_sql = f"""
+        CREATE OR REPLACE TEMPORARY TABLE {stage_table} AS
+        WITH win AS (
+            SELECT {key_list},
+                   MIN_BY({editable_column}_OLD, {audit_ts}) AS RESTORE_VALUE,
+                   MAX_BY({editable_column}_NEW, {audit_ts}) AS REVERTED_VALUE
+            FROM {target_table}
+            WHERE RECORD_FLAG IN ({flags}) AND {window}
+            GROUP BY {key_list}
+        )
+        SELECT win.*,
+               src.RECORD_FLAG IS NOT NULL AS HAS_SOURCE_ROW,
+               COALESCE(EQUAL_NULL(src.{editable_column}, win.REVERTED_VALUE)
+                        AND NOT EQUAL_NULL(win.RESTORE_VALUE, win.REVERTED_VALUE), FALSE) AS CAN_REVERT
+        FROM win
+        LEFT JOIN {source_table} src
+          ON {' AND '.join([f"EQUAL_NULL(src.{key}, win.{key})" for key in key_columns])}
+         AND src.RECORD_FLAG = 'A'
+    """
+    run_statement(session, statement_log, "stage keys to revert", stage_sql)
+    counts = run_statement(session, statement_log, "count keys to revert", f"""
+        SELECT COUNT_IF(CAN_REVERT) AS REVERTABLE,
+               COUNT_IF(HAS_SOURCE_ROW AND NOT EQUAL_NULL(RESTORE_VALUE, REVERTED_VALUE) AND NOT CAN_REVERT) AS CONFLICTS,
+               COUNT_IF(HAS_SOURCE_ROW AND EQUAL_NULL(RESTORE_VALUE, REVERTED_VALUE)) AS NO_NET_CHANGE,
+               COUNT_IF(NOT HAS_SOURCE_ROW) AS NO_SOURCE_ROW
+        FROM {stage_table}
+    """)[0].as_dict()
+
+    result = {"revertable": counts['REVERTABLE'], "conflicts": counts['CONFLICTS'],
+              "no_net_change": counts['NO_NET_CHANGE'], "no_source_row": counts['NO_SOURCE_ROW'],
+              "reverted": 0, "dry_run": dry_run, "statements": statement_log}
+    if counts['REVERTABLE'] == 0:
+        return result
+
+    # Columns copied from the current source row
+    excluded = [editable_column, 'RECORD_FLAG', source_ts, audit_ts, 'SRC_INS_TS',
+                f'{editable_column}_OLD', f'{editable_column}_NEW']
+    audit_common_columns = [col for col in source_metadata['COLUMN_NAME'] if col in target_columns and col not in excluded]
+    source_common_columns = [col for col in source_metadata['COLUMN_NAME']
+                             if col not in [editable_column, 'RECORD_FLAG', source_ts]]
+
+    # Step 0: Re-check inside the transaction that each key still holds the value to revert
+    # (another submit may have changed it since staging); every later step relies on CAN_REVERT
+    recheck_sql = f"""
+        UPDATE {stage_table} stg
+        SET CAN_REVERT = FALSE
+        WHERE stg.CAN_REVERT
+          AND NOT EXISTS (
+              SELECT 1 FROM {source_table} src
+               WHERE {stage_match} AND {current_match})
+    """
+
+    # Step 1: Log the revert as 'R' audit rows (old and new swapped)
+    audit_insert_sql = f"""
+        INSERT INTO {target_table} ({', '.join(audit_common_columns + ['SRC_INS_TS', f'{editable_column}_OLD', f'{editable_column}_NEW', 'RECORD_FLAG', audit_ts])})
+        SELECT {', '.join([f"src.{col}" for col in audit_common_columns] + [f"src.{source_ts}"])},
+               stg.REVERTED_VALUE, stg.RESTORE_VALUE, 'R', CURRENT_TIMESTAMP()
+        FROM {source_table} src
+        JOIN {stage_table} stg ON {stage_match}
+        WHERE {current_match}
+    """
+
+    # Step 2: Re-activate the previous values as new source rows
+    source_insert_sql = f"""
+        INSERT INTO {source_table} ({', '.join(source_common_columns + [editable_column, 'RECORD_FLAG', source_ts])})
+        SELECT {', '.join([f"src.{col}" for col in source_common_columns])},
+               stg.RESTORE_VALUE, 'A', CURRENT_TIMESTAMP()
+        FROM {source_table} src
+        JOIN {stage_table} stg ON {stage_match}
+        WHERE {current_match}
+    """
+
+    # Step 3: Mark the overridden source rows as 'D' (the new rows hold the restored value)
+    source_update_sql = f"""
+        UPDATE {source_table} src
+        SET record_flag = 'D'
+        FROM {stage_table} stg
+        WHERE {stage_match}
+          AND {current_match}
+    """
+
+    # Step 4: Mark the reverted audit rows as 'D'
+    target_update_sql = f"""
+        UPDATE {target_table} src
+        SET record_flag = 'D'
+        FROM {stage_table} stg
+        WHERE {stage_match}
+          AND stg.CAN_REVERT
+          AND src.RECORD_FLAG IN ({flags})
+          AND src.{window}
+    """
+
+    run_statement(session, statement_log, "begin", "BEGIN", dry_run)
+    try:
+        run_statement(session, statement_log, "re-check keys to revert", recheck_sql, dry_run)
+        inserted = run_statement(session, statement_log, "insert revert audit rows", audit_insert_sql, dry_run)
+        run_statement(session, statement_log, "insert restored source rows", source_insert_sql, dry_run)
+        run_statement(session, statement_log, "flag overridden source rows", source_update_sql, dry_run)
+        run_statement(session, statement_log, "flag reverted audit rows", target_update_sql, dry_run)
+        run_statement(session, statement_log, "commit", "COMMIT", dry_run)
+    except Exception:
+        session.sql("ROLLBACK").collect()
+        raise
+
+    result["reverted"] = inserted[0][0] if inserted else 0
+    return result
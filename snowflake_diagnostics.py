@@ -0,0 +1,230 @@
+import argparse
+import sys
+import time
+
+# Connection and warehouse latency diagnostics.
+# Times login, warehouse resume, query compile/queue/execute and client-side
+# transfer separately, using QUERY_HISTORY_BY_SESSION for the server-side split.
+# Nothing in this module imports streamlit; snowflake_test.py renders the results.
+
+# Query tag of diagnostic sessions, kept apart from the app's own tag so probes do not count as app traffic
+DIAGNOSTICS_QUERY_TAG = "override_app_diagnostics"
+
+# Query that always needs a running warehouse (a plain SELECT 1 may not)
+WAREHOUSE_PROBE_SQL = "SELECT COUNT(*) FROM TABLE(GENERATOR(ROWCOUNT => 1000))"
+
+SERVER_TIMING_COLUMNS = [
+    "COMPILATION_TIME",
+    "QUEUED_PROVISIONING_TIME",
+    "QUEUED_OVERLOAD_TIME",
+    "EXECUTION_TIME",
+    "TOTAL_ELAPSED_TIME",
+]
+
+
+# Function to compute a percentile (0-100) of a list of numbers with linear interpolation
+def percentile(values, pct):
+    if not values:
+        return None
+    ordered = sorted(values)
+    position = (len(ordered) - 1) * pct / 100
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+# Function to summarise a list of timings in milliseconds
+def summarize(values):
+    return {
+        "count": len(values),
+        "min": min(values) if values else None,
+        "p50": percentile(values, 50),
+        "p90": percentile(values, 90),
+        "p99": percentile(values, 99),
+        "max": max(values) if values else None,
+    }
+
+
+# Function to time the Snowflake login
+def time_login(connection_parameters):
+    from override_engine import create_session
+
+    start = time.perf_counter()
+    session = create_session(connection_parameters, DIAGNOSTICS_QUERY_TAG)
+    login_ms = (time.perf_counter() - start) * 1000
+    return session, login_ms
+
+
+# Function to read the warehouse state (STARTED, SUSPENDED, ...) and size
+def fetch_warehouse_state(session):
+    warehouse = session.get_current_warehouse()
+    if not warehouse:
+        return {"name": None, "state": None, "size": None}
+    warehouse = warehouse.strip('"')
+    rows = session.sql(f"SHOW WAREHOUSES LIKE '{warehouse}'").collect()
+    if not rows:
+        return {"name": warehouse, "state": None, "size": None}
+    row = rows[0].as_dict()
+    return {"name": warehouse, "state": row.get("state"), "size": row.get("size")}
+
+
+# Function to run a query, returning its query id and client-side elapsed milliseconds
+def timed_query(session, sql, fetch="collect"):
+    with session.query_history() as history:
+        start = time.perf_counter()
+        if fetch == "pandas":
+            result = session.sql(sql).to_pandas()
+        else:
+            result = session.sql(sql).collect()
+        client_ms = (time.perf_counter() - start) * 1000
+    query_id = history.queries[-1].query_id if history.queries else None
+    return query_id, client_ms, result
+
+
+# Function to fetch the server-side timing split of the given queries
+def fetch_server_timings(session, query_ids):
+    query_ids = [query_id for query_id in query_ids if query_id]
+    if not query_ids:
+        return {}
+    id_list = ", ".join([f"'{query_id}'" for query_id in query_ids])
+    rows = session.sql(f"""
+        SELECT QUERY_ID, {', '.join(SERVER_TIMING_COLUMNS)}
+        FROM TABLE(INFORMATION_SCHEMA.QUERY_HISTORY_BY_SESSION(RESULT_LIMIT => 10000))
+        WHERE QUERY_ID IN ({id_list})
+    """).collect()
+    return {row['QUERY_ID']: {col: row[col] or 0 for col in SERVER_TIMING_COLUMNS} for row in rows}
+
+
+# Function to run repeated round-trip probes and split client time into server phases
+def run_round_trip_probes(session, probe_count=20):
+    # Bypass the result cache so every probe reaches the warehouse
+    session.sql("ALTER SESSION SET USE_CACHED_RESULT = FALSE").collect()
+
+    probes = []
+    for _ in range(probe_count):
+        query_id, client_ms, _ = timed_query(session, WAREHOUSE_PROBE_SQL)
+        probes.append({"query_id": query_id, "client_ms": client_ms})
+
+    server_timings = fetch_server_timings(session, [probe["query_id"] for probe in probes])
+    for probe in probes:
+        timings = server_timings.get(probe["query_id"], {})
+        probe.update(timings)
+        # Whatever the server did not account for is network and client overhead
+        probe["overhead_ms"] = probe["client_ms"] - timings.get("TOTAL_ELAPSED_TIME", 0)
+
+    first_probe = probes[0] if probes else {}
+    warm_probes = probes[1:] or probes
+    return {
+        "probes": probes,
+        "first_query_ms": first_probe.get("client_ms"),
+        "resume_ms": first_probe.get("QUEUED_PROVISIONING_TIME", 0),
+        "client": summarize([probe["client_ms"] for probe in warm_probes]),
+        "compile": summarize([probe.get("COMPILATION_TIME", 0) for probe in warm_probes]),
+        "queued": summarize([probe.get("QUEUED_OVERLOAD_TIME", 0) for probe in warm_probes]),
+        "execute": summarize([probe.get("EXECUTION_TIME", 0) for probe in warm_probes]),
+        "overhead": summarize([probe["overhead_ms"] for probe in warm_probes]),
+    }
+
+
+# Function to measure fetch throughput for a generated result set of the given size
+def measure_fetch_throughput(session, row_count=100000):
+    sql = f"""
+        SELECT SEQ8() AS ID,
+               RANDSTR(64, RANDOM()) AS PAYLOAD,
+               UNIFORM(0, 1000000, RANDOM())::NUMBER(18, 2) AS AMOUNT
+        FROM TABLE(GENERATOR(ROWCOUNT => {int(row_count)}))
+    """
+    query_id, client_ms, result_df = timed_query(session, sql, fetch="pandas")
+    server_ms = fetch_server_timings(session, [query_id]).get(query_id, {}).get("TOTAL_ELAPSED_TIME", 0)
+
+    transfer_ms = max(client_ms - server_ms, 0.001)
+    result_bytes = int(result_df.memory_usage(deep=True).sum())
+    return {
+        "rows": len(result_df),
+        "bytes": result_bytes,
+        "client_ms": client_ms,
+        "server_ms": server_ms,
+        "transfer_ms": transfer_ms,
+        "rows_per_second": len(result_df) / (transfer_ms / 1000),
+        "mb_per_second": result_bytes / 1_000_000 / (transfer_ms / 1000),
+    }
+
+
+# Function to turn the measurements into tuning advice
+def recommendations(report):
+    advice = []
+    probes = report["probes"]
+    throughput = report.get("throughput")
+
+    if report["warehouse"]["state"] == "SUSPENDED" or probes["resume_ms"] > 1000:
+        advice.append(f"Warehouse resume cost {probes['resume_ms']:.0f} ms on the first query: "
+                      "raise AUTO_SUSPEND or keep the warehouse warm during business hours.")
+    if probes["queued"]["p90"] and probes["queued"]["p90"] > 100:
+        advice.append("Queries queue behind other work (p90 "
+                      f"{probes['queued']['p90']:.0f} ms): use a larger or multi-cluster warehouse.")
+    if probes["execute"]["p50"] and probes["execute"]["p50"] > probes["overhead"]["p50"]:
+        advice.append("Execution dominates round-trip time: a larger warehouse will help.")
+    if probes["compile"]["p50"] and probes["compile"]["p50"] > probes["execute"]["p50"]:
+        advice.append("Compilation takes longer than execution: simplify or batch statements in client code.")
+    if probes["overhead"]["p50"] and probes["overhead"]["p50"] > probes["client"]["p50"] / 2:
+        advice.append("Most time is spent outside Snowflake (network/driver): reduce round trips in client code.")
+    if throughput and throughput["mb_per_second"] < 10:
+        advice.append(f"Fetch throughput is low ({throughput['mb_per_second']:.1f} MB/s): "
+                      "fetch fewer columns/rows or aggregate server-side.")
+    if report["login_ms"] > 3000:
+        advice.append(f"Login took {report['login_ms']:.0f} ms: reuse sessions instead of reconnecting.")
+    return advice or ["No bottleneck detected."]
+
+
+# Function to run all diagnostics and return a report
+def run_diagnostics(connection_parameters, probe_count=20, fetch_rows=100000):
+    session, login_ms = time_login(connection_parameters)
+    try:
+        report = {
+            "login_ms": login_ms,
+            "warehouse": fetch_warehouse_state(session),
+            "probes": run_round_trip_probes(session, probe_count),
+        }
+        if fetch_rows:
+            report["throughput"] = measure_fetch_throughput(session, fetch_rows)
+        report["recommendations"] = recommendations(report)
+        return report
+    finally:
+        session.close()
+
+
+# Function to print a report to the terminal
+def print_report(report):
+    warehouse = report["warehouse"]
+    probes = report["probes"]
+    print(f"Login:              {report['login_ms']:.0f} ms")
+    print(f"Warehouse:          {warehouse['name']} ({warehouse['size']}, {warehouse['state']} before probes)")
+    print(f"First query:        {probes['first_query_ms']:.0f} ms (resume {probes['resume_ms']:.0f} ms)")
+    print(f"{'phase (ms)':<20}{'p50':>10}{'p90':>10}{'p99':>10}{'max':>10}")
+    for phase in ["client", "compile", "queued", "execute", "overhead"]:
+        stats = probes[phase]
+        print(f"{phase:<20}{stats['p50']:>10.1f}{stats['p90']:>10.1f}{stats['p99']:>10.1f}{stats['max']:>10.1f}")
+    if "throughput" in report:
+        throughput = report["throughput"]
+        print(f"Fetch:              {throughput['rows']} rows, {throughput['bytes'] / 1_000_000:.1f} MB in "
+              f"{throughput['client_ms']:.0f} ms (server {throughput['server_ms']:.0f} ms) -> "
+              f"{throughput['mb_per_second']:.1f} MB/s, {throughput['rows_per_second']:.0f} rows/s")
+    print("Recommendations:")
+    for advice in report["recommendations"]:
+        print(f"  - {advice}")
+
+
+def main(argv=None):
+    from override_cli import connection_parameters_from_env
+
+    parser = argparse.ArgumentParser(description="Time Snowflake login, warehouse resume, compile and fetch phases.")
+    parser.add_argument("--probes", type=int, default=20, help="Number of round-trip probes")
+    parser.add_argument("--fetch-rows", type=int, default=100000, help="Rows in the throughput test (0 to skip)")
+    args = parser.parse_args(argv)
+
+    print_report(run_diagnostics(connection_parameters_from_env(), args.probes, args.fetch_rows))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,22 +1,24 @@
 import streamlit as st
-from snowflake.snowpark import Session
+
+from app_core import connection_parameters
+from snowflake_diagnostics import (
+    time_login,
+    fetch_warehouse_state,
+    run_round_trip_probes,
+    measure_fetch_throughput,
+    recommendations,
+)
 
 st.title("🔗 Snowflake Connection Test")
 
-# Get credentials from Streamlit secrets
-connection_parameters = {
-    "account": st.secrets["SNOWFLAKE_ACCOUNT"],
-    "user": st.secrets["SNOWFLAKE_USER"],
-    "password": st.secrets["SNOWFLAKE_PASSWORD"],
-    "warehouse": st.secrets["SNOWFLAKE_WAREHOUSE"],
-    "database": st.secrets["SNOWFLAKE_DATABASE"],
-    "schema": st.secrets["SNOWFLAKE_SCHEMA"],
-}
+# Diagnostic settings
+probe_count = st.sidebar.slider("Round-trip probes", min_value=5, max_value=100, value=20)
+fetch_rows = st.sidebar.select_slider("Fetch test rows", options=[0, 10000, 100000, 500000, 1000000], value=100000)
 
 # Test connection
 try:
-    session = Session.builder.configs(connection_parameters).create()
-    st.success("✅ Successfully connected to Snowflake!")
+    session, login_ms = time_login(connection_parameters())
+    st.success(f"✅ Successfully connected to Snowflake in {login_ms:.0f} ms!")
     
     # Run a test query
     query_result = session.sql("SELECT CURRENT_USER(), CURRENT_ACCOUNT(), CURRENT_DATABASE(), CURRENT_SCHEMA()").collect()
@@ -28,6 +30,40 @@ try:
         st.write(f"🏢 Account: {row[1]}")
         st.write(f"📂 Database: {row[2]}")
         st.write(f"📑 Schema: {row[3]}")
+
+    # Latency diagnostics
+    if st.button("Run Latency Diagnostics"):
+        report = {"login_ms": login_ms, "warehouse": fetch_warehouse_state(session)}
+        warehouse = report["warehouse"]
+        st.write(f"🏭 Warehouse: {warehouse['name']} ({warehouse['size']}, {warehouse['state']} before probes)")
+
+        with st.spinner(f"Running {probe_count} round-trip probes..."):
+            report["probes"] = run_round_trip_probes(session, probe_count)
+        probes = report["probes"]
+
+        st.write("### Round-Trip Phases (ms)")
+        col1, col2, col3 = st.columns(3)
+        col1.metric("Login", f"{login_ms:.0f}")
+        col2.metric("First Query", f"{probes['first_query_ms']:.0f}")
+        col3.metric("Warehouse Resume", f"{probes['resume_ms']:.0f}")
+        st.table({
+            phase: {stat: round(value, 1) for stat, value in probes[phase].items() if stat != "count"}
+            for phase in ["client", "compile", "queued", "execute", "overhead"]
+        })
+
+        if fetch_rows:
+            with st.spinner(f"Fetching {fetch_rows} rows..."):
+                report["throughput"] = measure_fetch_throughput(session, fetch_rows)
+            throughput = report["throughput"]
+            st.write("### Fetch Throughput")
+            col1, col2, col3 = st.columns(3)
+            col1.metric("Size", f"{throughput['bytes'] / 1_000_000:.1f} MB")
+            col2.metric("Transfer", f"{throughput['mb_per_second']:.1f} MB/s")
+            col3.metric("Rows/s", f"{throughput['rows_per_second']:,.0f}")
+
+        st.write("### Recommendations")
+        for advice in recommendations(report):
+            st.write(f"💡 {advice}")
     
     session.close()
 
@@ -0,0 +1,76 @@
+import datetime
+
+import pandas as pd
+import pytest
+
+import change_feed
+from change_feed import apply_change_events, changes_since, latest_watermark, publish_changes, publish_reload
+
+
+@pytest.fixture(autouse=True)
+def empty_feed(monkeypatch):
+    monkeypatch.setattr(change_feed, "_events", {})
+    monkeypatch.setattr(change_feed, "_evicted", {})
+
+
+# Function to build a cached slice as Snowflake loads it (DATE keys arrive as datetime.date objects)
+def cached_table():
+    return pd.DataFrame({
+        "ASOFDATE": [datetime.date(2024, 1, 31), datetime.date(2024, 1, 31), datetime.date(2024, 2, 29)],
+        "SEGMENT": ["EQ", "FI", "EQ"],
+        "AMOUNT": [1.0, 2.0, 3.0],
+    })
+
+
+def test_update_event_patches_matching_keys_from_excel_timestamps():
+    df = cached_table()
+    changes = pd.DataFrame({"ASOFDATE": pd.to_datetime(["2024-01-31 00:00:00"]), "SEGMENT": ["FI"], "AMOUNT": [20.0]})
+    publish_changes("portfolio", ["ASOFDATE", "SEGMENT"], "AMOUNT", changes)
+
+    events, watermark = changes_since("portfolio", 0)
+    assert apply_change_events(df, events)
+    assert df["AMOUNT"].tolist() == [1.0, 20.0, 3.0]
+    assert watermark == latest_watermark("portfolio")
+
+
+def test_numeric_keys_match_across_types():
+    df = pd.DataFrame({"ID": [1, 2], "AMOUNT": [1.0, 2.0]})
+    apply_change_events(df, [{"type": "update", "keys": ["ID"], "column": "AMOUNT",
+                              "changes": pd.DataFrame({"ID": ["2"], "AMOUNT": [5.0]})}])
+    assert df["AMOUNT"].tolist() == [1.0, 5.0]
+
+
+def test_keys_that_do_not_survive_the_cast_ask_for_reload():
+    df = pd.DataFrame({"ID": [1, 2], "AMOUNT": [1.0, 2.0]})
+    assert not apply_change_events(df, [{"type": "update", "keys": ["ID"], "column": "AMOUNT",
+                                         "changes": pd.DataFrame({"ID": [2.7], "AMOUNT": [5.0]})}])
+    assert df["AMOUNT"].tolist() == [1.0, 2.0]
+
+
+def test_reload_event_and_unparseable_keys_ask_for_reload():
+    df = cached_table()
+    assert not apply_change_events(df, [{"type": "reload"}])
+
+    bad_keys = pd.DataFrame({"ASOFDATE": ["not a date"], "SEGMENT": ["EQ"], "AMOUNT": [9.0]})
+    assert not apply_change_events(df, [{"type": "update", "keys": ["ASOFDATE", "SEGMENT"], "column": "AMOUNT",
+                                         "changes": bad_keys}])
+
+
+def test_changes_since_returns_only_newer_events():
+    first = publish_reload("portfolio")
+    second = publish_reload("portfolio")
+    events, watermark = changes_since("portfolio", first)
+    assert [event["seq"] for event in events] == [second]
+    assert changes_since("portfolio", watermark) == ([], watermark)
+
+
+def test_changes_since_reports_evicted_history(monkeypatch):
+    monkeypatch.setattr(change_feed, "HISTORY_SIZE", 3)
+    sequences = [publish_reload("portfolio") for _ in range(5)]
+
+    events, watermark = changes_since("portfolio", sequences[0])
+    assert events is None
+    assert watermark == sequences[-1]
+
+    events, _ = changes_since("portfolio", sequences[1])
+    assert [event["seq"] for event in events] == sequences[2:]
@@ -0,0 +1,101 @@
+import datetime
+
+import pandas as pd
+
+from override_engine import stage_changes, validate_changes
+
+JOIN_KEYS = ['ASOFDATE', 'SEGMENT']
+
+
+# Function to build INFORMATION_SCHEMA-style metadata for a NUMBER(10,2) AMOUNT column
+def source_metadata(is_nullable="YES"):
+    return pd.DataFrame([
+        {"COLUMN_NAME": "ASOFDATE", "DATA_TYPE": "DATE", "IS_NULLABLE": "NO",
+         "NUMERIC_PRECISION": None, "NUMERIC_SCALE": None, "CHARACTER_MAXIMUM_LENGTH": None},
+        {"COLUMN_NAME": "SEGMENT", "DATA_TYPE": "TEXT", "IS_NULLABLE": "NO",
+         "NUMERIC_PRECISION": None, "NUMERIC_SCALE": None, "CHARACTER_MAXIMUM_LENGTH": 20},
+        {"COLUMN_NAME": "AMOUNT", "DATA_TYPE": "NUMBER", "IS_NULLABLE": is_nullable,
+         "NUMERIC_PRECISION": 10, "NUMERIC_SCALE": 2, "CHARACTER_MAXIMUM_LENGTH": None},
+    ])
+
+
+# Function to build a change set with one row per amount
+def changes(amounts, segments=None):
+    segments = segments or [f"S{i}" for i in range(len(amounts))]
+    return pd.DataFrame({"ASOFDATE": ["2024-01-31"] * len(amounts), "SEGMENT": segments, "AMOUNT": amounts})
+
+
+def test_valid_changes_pass_and_are_coerced():
+    errors, validated = validate_changes(changes(["1.5", 2]), source_metadata(), "AMOUNT", JOIN_KEYS)
+    assert errors == []
+    assert validated["AMOUNT"].tolist() == [1.5, 2.0]
+
+
+def test_missing_value_rejected_by_default_on_nullable_column():
+    errors, _ = validate_changes(changes([1.0, float("nan")]), source_metadata("YES"), "AMOUNT", JOIN_KEYS)
+    assert errors == ["Empty AMOUNT values on lines: [3]"]
+
+
+def test_missing_value_allowed_only_when_rule_and_column_allow_it():
+    errors, _ = validate_changes(changes([None]), source_metadata("YES"), "AMOUNT", JOIN_KEYS, {"allow_null": True})
+    assert errors == []
+
+    errors, _ = validate_changes(changes([None]), source_metadata("NO"), "AMOUNT", JOIN_KEYS, {"allow_null": True})
+    assert errors == ["Empty AMOUNT values on lines: [2]"]
+
+
+def test_values_beyond_precision_rejected():
+    errors, _ = validate_changes(changes([99999999.99, 100000000]), source_metadata(), "AMOUNT", JOIN_KEYS,
+                                 location="row")
+    assert errors == ["AMOUNT values too large for NUMBER(10,2) on rows: [2]"]
+
+
+def test_non_numeric_and_infinite_values_rejected():
+    errors, _ = validate_changes(changes(["abc", float("inf")]), source_metadata(), "AMOUNT", JOIN_KEYS)
+    assert "Non-numeric AMOUNT values on lines: [2]" in errors
+    assert "Infinite AMOUNT values on lines: [3]" in errors
+
+
+def test_duplicate_keys_reported_for_every_row():
+    errors, _ = validate_changes(changes([1, 2, 3], ["A", "B", "A"]), source_metadata(), "AMOUNT", JOIN_KEYS)
+    assert errors == ["Duplicate joining keys on lines: [2, 4]"]
+
+
+def test_missing_columns_stop_validation():
+    errors, validated = validate_changes(changes([1]).drop(columns=["SEGMENT"]), source_metadata(), "AMOUNT", JOIN_KEYS)
+    assert errors == ["Missing required columns: SEGMENT"]
+    assert validated.empty
+
+
+def test_key_values_converted_and_checked_against_column_types():
+    changes_df = pd.DataFrame({"ASOFDATE": ["2024-01-31", "not a date"], "SEGMENT": ["EQ", "FI"], "AMOUNT": [1, 2]})
+    errors, validated = validate_changes(changes_df, source_metadata(), "AMOUNT", JOIN_KEYS)
+    assert errors == ["Invalid ASOFDATE values for type DATE on lines: [3]"]
+    assert validated["ASOFDATE"].iloc[0] == datetime.date(2024, 1, 31)
+
+
+def test_excel_timestamp_keys_become_dates():
+    changes_df = changes([1.0])
+    changes_df["ASOFDATE"] = pd.to_datetime(changes_df["ASOFDATE"])
+    errors, validated = validate_changes(changes_df, source_metadata(), "AMOUNT", JOIN_KEYS)
+    assert errors == []
+    assert validated["ASOFDATE"].tolist() == [datetime.date(2024, 1, 31)]
+
+
+# Session stand-in that records what would be written to Snowflake
+class RecordingSession:
+    def write_pandas(self, df, table_name, **kwargs):
+        self.written = df
+
+
+def test_stage_changes_writes_dates_as_iso_strings():
+    session = RecordingSession()
+    stage_changes(session, pd.DataFrame({
+        "ASOFDATE": [datetime.date(2024, 1, 31), None],
+        "TS": pd.to_datetime(["2024-01-31 10:30:00", None]),
+        "AMOUNT": [1.0, 2.0],
+    }), "STAGE")
+    assert session.written["ASOFDATE"].iloc[0] == "2024-01-31"
+    assert pd.isna(session.written["ASOFDATE"].iloc[1])
+    assert session.written["TS"].iloc[0] == "2024-01-31 10:30:00.000000"
+    assert pd.isna(session.written["TS"].iloc[1])